@@ -0,0 +1,137 @@
+"""
+Course completion funnel for creators.
+
+Two grouped aggregations per course: completions per lesson (progress joined
+to the course's lessons) and, per enrolled student, how many lessons they
+have completed, grouped again into a distribution. Results are cached per
+course and invalidated whenever enrollments, progress or lessons of that
+course change.
+"""
+import os
+import time
+import threading
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from app.models.enrollment import Enrollment
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from app.database.routing import use_primary
+from app.utils.cache import TTLCache
+
+
+class CourseAnalyticsCache:
+    """
+    Per-course results keyed by a generation number. Invalidating bumps the
+    generation, so a result computed while progress was being written is
+    stored under the old generation and never served.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, course_id: int) -> int:
+        with self._lock:
+            return self._generations.get(course_id, 0)
+
+    def invalidate(self, course_id: int):
+        with self._lock:
+            self._generations[course_id] = self._generations.get(course_id, 0) + 1
+
+    def stats(self):
+        return self.entries.stats()
+
+
+analytics_cache = CourseAnalyticsCache(
+    maxsize=int(os.getenv("ANALYTICS_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ANALYTICS_CACHE_TTL", "600")),
+)
+
+
+def invalidate(course_id: int):
+    analytics_cache.invalidate(course_id)
+
+
+def _lesson_counts(db: Session, course_id: int):
+    completed = (
+        select(Progress.lesson_id, func.count().label("completed"))
+        .where(Progress.course_id == course_id, Progress.is_completed == True)
+        .group_by(Progress.lesson_id)
+        .subquery()
+    )
+    return db.execute(
+        select(Lesson.id, Lesson.title, func.coalesce(completed.c.completed, 0))
+        .outerjoin(completed, completed.c.lesson_id == Lesson.id)
+        .where(Lesson.course_id == course_id)
+        .order_by(Lesson.id)
+    ).all()
+
+
+def _distribution(db: Session, course_id: int):
+    per_student = (
+        select(func.count(Progress.id).label("done"))
+        .select_from(Enrollment)
+        .outerjoin(
+            Progress,
+            and_(
+                Progress.student_id == Enrollment.student_id,
+                Progress.course_id == Enrollment.course_id,
+                Progress.is_completed == True,
+            ),
+        )
+        .where(Enrollment.course_id == course_id)
+        .group_by(Enrollment.student_id)
+        .subquery()
+    )
+    return db.execute(
+        select(per_student.c.done, func.count()).group_by(per_student.c.done).order_by(per_student.c.done)
+    ).all()
+
+
+def compute_course_analytics(db: Session, course_id: int):
+    lessons = _lesson_counts(db, course_id)
+    students_by_done = dict(_distribution(db, course_id))
+    lesson_total = len(lessons)
+    enrolled = sum(students_by_done.values())
+    completed_students = sum(n for done, n in students_by_done.items() if lesson_total and done >= lesson_total)
+
+    funnel = []
+    previous = enrolled
+    for position, (lesson_id, title, completed) in enumerate(lessons, start=1):
+        funnel.append({
+            "lesson_id": lesson_id,
+            "position": position,
+            "title": title,
+            "completed": completed,
+            "completion_rate": round(completed / enrolled, 4) if enrolled else 0.0,
+            # Students lost relative to the previous step of the funnel
+            "drop_off": max(previous - completed, 0),
+        })
+        previous = completed
+
+    return {
+        "course_id": course_id,
+        "lesson_total": lesson_total,
+        "enrolled": enrolled,
+        "completed_students": completed_students,
+        "completion_rate": round(completed_students / enrolled, 4) if enrolled else 0.0,
+        "lessons": funnel,
+        "distribution": [
+            {"lessons_completed": done, "students": students_by_done.get(done, 0)}
+            for done in range(lesson_total + 1)
+        ],
+        "computed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def get_course_analytics(db: Session, course_id: int):
+    generation = analytics_cache.generation(course_id)
+    key = (course_id, generation)
+    result = analytics_cache.entries.get(key)
+    if result is None:
+        # Served to every later viewer: compute on the primary, not a lagging replica
+        use_primary(db)
+        result = compute_course_analytics(db, course_id)
+        analytics_cache.entries.set(key, result)
+    return result
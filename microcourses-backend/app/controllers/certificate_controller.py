@@ -0,0 +1,62 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.user_model import User
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from app.utils.certificate_pdf import render_many_offloaded
+from app.utils.certificate_cache import certificate_cache, certificate_key
+
+
+def count_lessons(db: Session, course_id: int) -> int:
+    return db.query(func.count(Lesson.id)).filter(Lesson.course_id == course_id).scalar()
+
+
+def query_completed_students(db: Session, course_id: int, total_lessons: int):
+    """
+    Students who completed every lesson of the course, decided by one grouped
+    query over Progress. Rows are (id, email), ordered by student id.
+    """
+    return (
+        db.query(User.id, User.email)
+        .join(Progress, Progress.student_id == User.id)
+        .filter(Progress.course_id == course_id, Progress.is_completed == True)
+        .group_by(User.id, User.email)
+        .having(func.count(func.distinct(Progress.lesson_id)) >= total_lessons)
+        .order_by(User.id)
+    )
+
+
+def iter_cohort_certificates(db: Session, course, total_lessons: int, batch_size: int = 64):
+    """
+    Yield (filename, pdf_bytes) for every student who completed the course.
+    Students are read with `yield_per` and rendered a batch at a time in the
+    worker pool; certificates already in the cache are reused.
+    """
+    students = query_completed_students(db, course.id, total_lessons).yield_per(batch_size)
+    batch = []
+    for student in students:
+        batch.append(student)
+        if len(batch) >= batch_size:
+            yield from _certificate_batch(batch, course, total_lessons)
+            batch = []
+    if batch:
+        yield from _certificate_batch(batch, course, total_lessons)
+
+
+def _certificate_batch(students, course, total_lessons):
+    keys = [
+        certificate_key(s.id, course.id, s.email, course.title, total_lessons, total_lessons)
+        for s in students
+    ]
+    cached = [certificate_cache.get(key) for key in keys]
+    misses = [i for i, path in enumerate(cached) if path is None]
+    rendered = dict(zip(misses, render_many_offloaded([(students[i].email, course.title, None) for i in misses])))
+
+    for i, student in enumerate(students):
+        if i in rendered:
+            data = rendered[i]
+            certificate_cache.put(keys[i], data)
+        else:
+            with open(cached[i], "rb") as f:
+                data = f.read()
+        yield f"certificate_{student.id}_{student.email}.pdf", data
@@ -0,0 +1,242 @@
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+from app.database.dialect import dialect_insert
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from app.models.completion_model import CourseLessonCount, CompletionBitmap
+from app.database.routing import use_primary
+from app.utils.cache import TTLCache
+from app.controllers.progress_buffer import progress_buffer
+
+# Ordered lesson ids per course, used to turn bit positions back into ids.
+# Lessons are append-only, so an entry is valid while its length matches the lesson total.
+_lesson_ids_cache = TTLCache(maxsize=4096, ttl=3600)
+
+
+def _set_bit(bits: bytes, position: int) -> bytes:
+    data = bytearray(bits)
+    if len(data) <= position // 8:
+        data.extend(b"\x00" * (position // 8 + 1 - len(data)))
+    data[position // 8] |= 1 << (position % 8)
+    return bytes(data)
+
+
+def _to_bytes(value: int) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+
+def popcount(bits: bytes) -> int:
+    return int.from_bytes(bits, "little").bit_count()
+
+
+def _positions(bits: bytes):
+    value = int.from_bytes(bits, "little")
+    position = 0
+    while value:
+        if value & 1:
+            yield position
+        value >>= 1
+        position += 1
+
+
+def _count_lessons(db: Session, course_id: int) -> int:
+    return db.query(func.count(Lesson.id)).filter(Lesson.course_id == course_id).scalar()
+
+
+def _ensure_lesson_count(db: Session, course_id: int) -> CourseLessonCount:
+    row = db.get(CourseLessonCount, course_id)
+    if row is None:
+        # Another writer may be creating the same row: insert-or-ignore, then read whichever won
+        insert = dialect_insert(db)
+        db.execute(
+            insert(CourseLessonCount)
+            .values(course_id=course_id, lesson_total=_count_lessons(db, course_id))
+            .on_conflict_do_nothing()
+        )
+        row = db.get(CourseLessonCount, course_id)
+    return row
+
+
+def on_lesson_added(db: Session, lesson: Lesson):
+    """
+    Keep the cached total in step with a newly flushed lesson. The new lesson
+    takes the next bit position, so existing bitmaps stay valid unchanged.
+    """
+    on_lessons_added(db, lesson.course_id, 1)
+
+
+def on_lessons_added(db: Session, course_id: int, count: int):
+    """Same as on_lesson_added for `count` lessons flushed to one course at once."""
+    updated = (
+        db.query(CourseLessonCount)
+        .filter(CourseLessonCount.course_id == course_id)
+        .update({CourseLessonCount.lesson_total: CourseLessonCount.lesson_total + count}, synchronize_session=False)
+    )
+    if not updated:
+        _ensure_lesson_count(db, course_id)
+    _lesson_ids_cache.invalidate(course_id)
+
+
+def on_enrolled(db: Session, student_id: int, course_id: int):
+    """Start an empty bitmap with a new enrollment, so progress reads stay single-row lookups."""
+    insert = dialect_insert(db)
+    db.execute(
+        insert(CompletionBitmap).values(student_id=student_id, course_id=course_id, bits=b"").on_conflict_do_nothing()
+    )
+
+
+def _progress_bits(db: Session, pairs: list, indexes: dict) -> dict:
+    """Bitmaps for (student_id, course_id) pairs built from their Progress rows, without writing them."""
+    bits = {pair: 0 for pair in pairs}
+    completed = (
+        db.query(Progress.student_id, Progress.course_id, Progress.lesson_id)
+        .filter(tuple_(Progress.student_id, Progress.course_id).in_(pairs), Progress.is_completed == True)
+    )
+    for student_id, course_id, lesson_id in completed:
+        position = indexes[course_id].get(lesson_id)
+        if position is not None:
+            bits[(student_id, course_id)] |= 1 << position
+    return {pair: _to_bytes(value) for pair, value in bits.items()}
+
+
+def _locked_bitmaps(db: Session, pairs: list) -> dict:
+    return {
+        (bitmap.student_id, bitmap.course_id): bitmap
+        for bitmap in db.query(CompletionBitmap)
+        .filter(tuple_(CompletionBitmap.student_id, CompletionBitmap.course_id).in_(pairs))
+        .with_for_update()
+    }
+
+
+def record_completions(db: Session, student_id: int, course_id: int, lesson_ids) -> list[int]:
+    """
+    Set the bits for `lesson_ids` (all in `course_id`) and return the ids that
+    were not already complete. Call before writing the Progress rows, inside
+    the same transaction, once the enrollment has been checked.
+    """
+    return record_completions_bulk(db, {(student_id, course_id): list(lesson_ids)})[(student_id, course_id)]
+
+
+def record_completions_bulk(db: Session, lessons_by_pair: dict) -> dict:
+    """
+    record_completions for many enrolled (student_id, course_id) pairs at
+    once: one locking read for all their bitmaps, and the changed rows are
+    flushed together. Returns the newly completed lesson ids per pair.
+    """
+    course_ids = {course_id for _, course_id in lessons_by_pair}
+    totals = {course_id: _ensure_lesson_count(db, course_id).lesson_total for course_id in course_ids}
+    indexes = {course_id: _lesson_index(db, course_id, total) for course_id, total in totals.items()}
+    bitmaps = _locked_bitmaps(db, list(lessons_by_pair))
+    missing = [pair for pair in lessons_by_pair if pair not in bitmaps]
+    if missing:
+        # Enrollments without a bitmap yet. Another writer may be creating the
+        # same rows: insert-or-ignore, then lock whichever rows exist
+        insert = dialect_insert(db)
+        db.execute(
+            insert(CompletionBitmap)
+            .values([
+                {"student_id": student_id, "course_id": course_id, "bits": bits}
+                for (student_id, course_id), bits in _progress_bits(db, missing, indexes).items()
+            ])
+            .on_conflict_do_nothing()
+        )
+        bitmaps.update(_locked_bitmaps(db, missing))
+    return {
+        pair: _set_lessons(bitmaps[pair], indexes[pair[1]], lesson_ids)
+        for pair, lesson_ids in lessons_by_pair.items()
+    }
+
+
+def _lesson_index(db: Session, course_id: int, lesson_total: int) -> dict:
+    return {lesson_id: position for position, lesson_id in enumerate(_lesson_ids(db, course_id, lesson_total))}
+
+
+def _set_lessons(bitmap: CompletionBitmap, index: dict, lesson_ids) -> list[int]:
+    value = int.from_bytes(bitmap.bits, "little")
+    newly_completed = []
+    for lesson_id in lesson_ids:
+        position = index.get(lesson_id)
+        if position is None or value >> position & 1:
+            continue
+        value |= 1 << position
+        newly_completed.append(lesson_id)
+
+    if newly_completed:
+        bitmap.bits = _to_bytes(value)
+    return newly_completed
+
+
+def get_completion(db: Session, student_id: int, course_id: int):
+    """
+    Return (lesson_total, bits) for a student's course with a single-row
+    lookup. Never writes: a missing bitmap is derived from Progress instead.
+    Completions still waiting in the write-behind buffer are included.
+    """
+    total, bits = _stored_completion(db, student_id, course_id)
+    pending = progress_buffer.pending_lessons(student_id, course_id)
+    if pending and total:
+        index = _lesson_index(db, course_id, total)
+        for lesson_id in pending:
+            if lesson_id in index:
+                bits = _set_bit(bits, index[lesson_id])
+    return total, bits
+
+
+def _completion_row(db: Session, student_id: int, course_id: int):
+    return (
+        db.query(CourseLessonCount.lesson_total, CompletionBitmap.bits)
+        .outerjoin(
+            CompletionBitmap,
+            (CompletionBitmap.course_id == CourseLessonCount.course_id)
+            & (CompletionBitmap.student_id == student_id),
+        )
+        .filter(CourseLessonCount.course_id == course_id)
+        .first()
+    )
+
+
+def _stored_completion(db: Session, student_id: int, course_id: int):
+    row = _completion_row(db, student_id, course_id)
+    if (row is None or row.bits is None) and use_primary(db):
+        # Rows are created on the primary; a replica may just be behind it
+        row = _completion_row(db, student_id, course_id)
+    if row is not None and row.bits is not None:
+        return row.lesson_total, row.bits
+
+    # No bitmap: not enrolled, or enrolled before bitmaps were kept
+    total = row.lesson_total if row is not None else _count_lessons(db, course_id)
+    if not total:
+        return 0, b""
+    pair = (student_id, course_id)
+    return total, _progress_bits(db, [pair], {course_id: _lesson_index(db, course_id, total)})[pair]
+
+
+def _lesson_ids(db: Session, course_id: int, lesson_total: int):
+    ids = _lesson_ids_cache.get(course_id)
+    if ids is None or len(ids) != lesson_total:
+        ids = tuple(
+            lesson_id for (lesson_id,) in
+            db.query(Lesson.id).filter(Lesson.course_id == course_id).order_by(Lesson.id)
+        )
+        _lesson_ids_cache.set(course_id, ids)
+    return ids
+
+
+def completed_lesson_ids(db: Session, course_id: int, lesson_total: int, bits: bytes) -> list[int]:
+    ids = _lesson_ids(db, course_id, lesson_total)
+    return [ids[position] for position in _positions(bits) if position < len(ids)]
+
+
+def is_lesson_complete(db: Session, course_id: int, lesson_total: int, bits: bytes | None, lesson_id: int) -> bool:
+    if not bits or not lesson_total:
+        return False
+    ids = _lesson_ids(db, course_id, lesson_total)
+    try:
+        position = ids.index(lesson_id)
+    except ValueError:
+        return False
+    return bool(int.from_bytes(bits, "little") >> position & 1)
+
+
+def is_course_complete(lesson_total: int, bits: bytes) -> bool:
+    return lesson_total > 0 and popcount(bits) >= lesson_total
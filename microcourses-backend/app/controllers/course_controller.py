@@ -1,13 +1,32 @@
 from sqlalchemy.orm import Session
 from app.models.course_model import Course
+from app.utils.catalog_cache import APPROVED_COURSES, catalog_cache
+from app.controllers import search_controller
+from app.utils.serialization import row_serializer
 
 def create_course(db: Session, title: str, description: str, creator_id: int):
     course = Course(title=title, description=description, creator_id=creator_id)
     db.add(course)
+    db.flush()
+    search_controller.index_course(db, course)
     db.commit()
     db.refresh(course)
+    catalog_cache.invalidate(APPROVED_COURSES)
     return course
 
+# Column projection for list endpoints: rows serialize like serialize_course without ORM hydration
+COURSE_COLUMNS = (Course.id, Course.title, Course.description, Course.creator_id, Course.is_approved)
+serialize_course_row = row_serializer(COURSE_COLUMNS)
+
+def serialize_course(course):
+    return {
+        "id": course.id,
+        "title": course.title,
+        "description": course.description,
+        "creator_id": course.creator_id,
+        "is_approved": course.is_approved,
+    }
+
 def get_all_courses(db: Session):
     return db.query(Course).all()
 
@@ -21,4 +40,5 @@ def approve_course(db: Session, course_id: int):
     course.is_approved = True
     db.commit()
     db.refresh(course)
+    catalog_cache.invalidate(APPROVED_COURSES)
     return course
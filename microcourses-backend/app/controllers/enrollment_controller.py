@@ -0,0 +1,126 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.enrollment import Enrollment
+from app.models.course_model import Course
+from app.models.progress_model import Progress
+from app.controllers import analytics_controller, completion_controller
+from app.controllers.progress_buffer import progress_buffer
+from app.controllers.course_controller import serialize_course
+
+
+def enroll_student(db: Session, student_id: int, course_id: int):
+    """
+    Enroll a student in an approved course.
+    Returns (course dict, status) where status is "enrolled", "already_enrolled" or "not_found".
+    """
+    course = (
+        db.query(Course)
+        .filter(Course.id == course_id, Course.is_approved == True)
+        .first()
+    )
+    if not course:
+        return None, "not_found"
+    # Detach the fields now; commit() expires the instance
+    course = serialize_course(course)
+
+    existing = (
+        db.query(Enrollment.id)
+        .filter(Enrollment.student_id == student_id, Enrollment.course_id == course_id)
+        .first()
+    )
+    if existing:
+        return course, "already_enrolled"
+
+    db.add(Enrollment(student_id=student_id, course_id=course_id))
+    try:
+        db.flush()
+        completion_controller.on_enrolled(db, student_id, course_id)
+        db.commit()
+    except IntegrityError:
+        # A concurrent request enrolled first (uix_enrollment)
+        db.rollback()
+        return course, "already_enrolled"
+    analytics_controller.invalidate(course_id)
+    return course, "enrolled"
+
+
+def get_enrollment_feed(
+    db: Session,
+    student_id: int,
+    after: int | None = None,
+    limit: int | None = None,
+    include_progress: bool = False,
+):
+    """
+    Return one page of a student's enrollments joined with their courses
+    (every enrollment when `limit` is None). Rows are ordered by enrollment id
+    so `after` works as a keyset cursor. Everything (including optional
+    progress counts) comes from a single statement, plus one lookup while the
+    student has completions in the write-behind buffer.
+    """
+    columns = [
+        Enrollment.id.label("enrollment_id"),
+        Course.id,
+        Course.title,
+        Course.description,
+        Course.is_approved,
+    ]
+
+    completed_counts = None
+    if include_progress:
+        completed_counts = (
+            db.query(
+                Progress.course_id.label("course_id"),
+                func.count(Progress.id).label("completed_lessons"),
+            )
+            .filter(Progress.student_id == student_id, Progress.is_completed == True)
+            .group_by(Progress.course_id)
+            .subquery()
+        )
+        columns.append(func.coalesce(completed_counts.c.completed_lessons, 0).label("completed_lessons"))
+
+    query = (
+        db.query(*columns)
+        .join(Course, Course.id == Enrollment.course_id)
+        .filter(Enrollment.student_id == student_id)
+    )
+    if completed_counts is not None:
+        query = query.outerjoin(completed_counts, completed_counts.c.course_id == Course.id)
+    if after is not None:
+        query = query.filter(Enrollment.id > after)
+
+    query = query.order_by(Enrollment.id)
+    rows = (query if limit is None else query.limit(limit)).all()
+
+    # Completions still in the write-behind buffer count as done. A batch is
+    # committed before it leaves the queue, so skip lessons already stored.
+    pending = progress_buffer.pending_by_course(student_id) if include_progress else {}
+    if pending:
+        stored = (
+            db.query(Progress.course_id, Progress.lesson_id)
+            .filter(
+                Progress.student_id == student_id,
+                Progress.is_completed == True,
+                Progress.lesson_id.in_(set().union(*pending.values())),
+            )
+            .all()
+        )
+        pending = {course_id: set(lessons) for course_id, lessons in pending.items()}
+        for course_id, lesson_id in stored:
+            pending.get(course_id, set()).discard(lesson_id)
+    items = []
+    for row in rows:
+        item = {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "is_approved": row.is_approved,
+        }
+        if include_progress:
+            item["completed_lessons"] = row.completed_lessons + len(pending.get(row.id, ()))
+        items.append(item)
+
+    # A full page means there may be more rows; hand back the last key seen.
+    next_after = rows[-1].enrollment_id if limit is not None and len(rows) == limit else None
+    return items, next_after
@@ -0,0 +1,66 @@
+"""
+Admin reporting exports.
+
+Each export is a Core select over plain columns, executed with `yield_per`
+(a server-side cursor on PostgreSQL) and handed on one partition of row
+tuples at a time, so memory stays flat however many rows there are and no
+ORM objects are built.
+"""
+import os
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.course_model import Course
+from app.models.enrollment import Enrollment
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from app.models.user_model import User
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+ENROLLMENT_COLUMNS = (
+    "enrollment_id", "student_id", "student_email", "student_name", "course_id", "course_title", "completed",
+)
+PROGRESS_COLUMNS = (
+    "progress_id", "student_id", "student_email", "course_id", "course_title", "lesson_id", "lesson_title",
+    "is_completed",
+)
+
+
+def enrollments_query(course_id: int | None = None):
+    stmt = (
+        select(
+            Enrollment.id, Enrollment.student_id, User.email, User.name,
+            Enrollment.course_id, Course.title, Enrollment.completed,
+        )
+        .join(User, User.id == Enrollment.student_id)
+        .join(Course, Course.id == Enrollment.course_id)
+        .order_by(Enrollment.id)
+    )
+    if course_id is not None:
+        stmt = stmt.where(Enrollment.course_id == course_id)
+    return stmt
+
+
+def progress_query(course_id: int | None = None):
+    stmt = (
+        select(
+            Progress.id, Progress.student_id, User.email, Progress.course_id, Course.title,
+            Progress.lesson_id, Lesson.title, Progress.is_completed,
+        )
+        .join(User, User.id == Progress.student_id)
+        .join(Course, Course.id == Progress.course_id)
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .order_by(Progress.id)
+    )
+    if course_id is not None:
+        stmt = stmt.where(Progress.course_id == course_id)
+    return stmt
+
+
+def stream_rows(db: Session, stmt, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield lists of Row tuples, `batch_size` at a time, from a streaming cursor."""
+    result = db.execute(stmt, execution_options={"yield_per": batch_size})
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
@@ -0,0 +1,200 @@
+"""
+Bulk course and lesson import.
+
+An upload is a stream of records, each either a course or a lesson:
+
+    {"type": "course", "ref": "py101", "title": "Python 101", "description": "..."}
+    {"type": "lesson", "course": "py101", "title": "Variables", "content": "..."}
+    {"type": "lesson", "course_id": 42, "title": "Loops", "content": "..."}
+
+CSV uses the same names as header columns. A lesson points at a course from
+the same upload by its `ref` (the course row must come first) or at one of the
+creator's existing courses by `course_id`. Rows are validated with the course
+and lesson schemas and written in executemany batches inside one transaction;
+rows that fail are reported by line number and skipped.
+"""
+import os
+from collections import Counter
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.course_model import Course
+from app.models.lesson_model import Lesson
+from app.schemas.course_schema import CourseCreate
+from app.schemas.lesson_schema import LessonBase
+from app.controllers import analytics_controller, completion_controller, search_controller
+from app.utils.catalog_cache import APPROVED_COURSES, catalog_cache, lessons_scope
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "50000"))
+MAX_REPORTED_ERRORS = 1000
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in exc.errors())
+
+
+class CourseImport:
+    """
+    State of one upload. `add` validates and queues a record, `flush` writes
+    the queue (courses first, so queued lessons can resolve their refs) and
+    `finish` flushes, updates lesson totals and commits.
+    """
+
+    def __init__(self, creator_id: int):
+        self.creator_id = creator_id
+        self.rows = 0
+        self.errors = []
+        self.error_count = 0
+        self.refs = {}  # ref -> id of a course created by this import
+        self.queued_refs = set()
+        self.failed_refs = set()
+        self.owned = {}  # existing course id -> belongs to the creator
+        self.course_ids = []
+        self.lessons_by_course = Counter()
+        self._courses = []  # (ref, row)
+        self._lessons = []  # (line, ref, course_id, row)
+
+    @property
+    def batch_full(self) -> bool:
+        return len(self._courses) + len(self._lessons) >= IMPORT_BATCH_SIZE
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def add(self, line: int, record: dict):
+        self.rows += 1
+        kind = str(record.get("type") or "").strip().lower()
+        if kind == "course":
+            self._add_course(line, record)
+        elif kind == "lesson":
+            self._add_lesson(line, record)
+        else:
+            self.error(line, "type must be 'course' or 'lesson'")
+
+    def _add_course(self, line: int, record: dict):
+        ref = record.get("ref")
+        ref = str(ref) if ref is not None else None
+        try:
+            course = CourseCreate.model_validate(record)
+        except ValidationError as exc:
+            if ref is not None:
+                self.failed_refs.add(ref)
+            self.error(line, _describe(exc))
+            return
+        if ref is not None and (ref in self.refs or ref in self.queued_refs):
+            self.error(line, f"Duplicate course ref '{ref}'")
+            return
+        if ref is not None:
+            self.queued_refs.add(ref)
+        self._courses.append((ref, {
+            "title": course.title,
+            "description": course.description,
+            "creator_id": self.creator_id,
+            "is_approved": False,
+        }))
+
+    def _add_lesson(self, line: int, record: dict):
+        try:
+            lesson = LessonBase.model_validate(record)
+        except ValidationError as exc:
+            self.error(line, _describe(exc))
+            return
+
+        ref, course_id = record.get("course"), record.get("course_id")
+        if ref is not None:
+            ref = str(ref)
+            if ref in self.failed_refs:
+                self.error(line, f"Course '{ref}' failed to import")
+                return
+            if ref not in self.refs and ref not in self.queued_refs:
+                self.error(line, f"Unknown course ref '{ref}' (course rows must come before their lessons)")
+                return
+        elif course_id is not None:
+            try:
+                course_id = int(course_id)
+            except (TypeError, ValueError):
+                self.error(line, "course_id must be an integer")
+                return
+        else:
+            self.error(line, "A lesson needs `course` (a ref from this import) or `course_id`")
+            return
+        self._lessons.append((line, ref, course_id, {"title": lesson.title, "content": lesson.content}))
+
+    def flush(self, db: Session):
+        documents = []
+        if self._courses:
+            # Refs map to ids by position, so courses keep parameter order
+            ids = db.execute(
+                insert(Course).returning(Course.id, sort_by_parameter_order=True),
+                [row for _, row in self._courses],
+            ).scalars().all()
+            for (ref, row), course_id in zip(self._courses, ids):
+                if ref is not None:
+                    self.refs[ref] = course_id
+                    self.queued_refs.discard(ref)
+                self.owned[course_id] = True
+                self.course_ids.append(course_id)
+                documents.append({"course_id": course_id, "lesson_id": None,
+                                  "title": row["title"], "body": row["description"]})
+            self._courses = []
+
+        # One ownership query per batch for existing courses not seen before
+        unchecked = {course_id for _, ref, course_id, _ in self._lessons if ref is None and course_id not in self.owned}
+        if unchecked:
+            owned = set(db.scalars(
+                select(Course.id).where(Course.id.in_(unchecked), Course.creator_id == self.creator_id)
+            ))
+            self.owned.update((course_id, course_id in owned) for course_id in unchecked)
+
+        rows = []
+        for line, ref, course_id, row in self._lessons:
+            course_id = self.refs[ref] if ref is not None else course_id
+            if not self.owned.get(course_id):
+                self.error(line, f"Course {course_id} not found or not yours")
+                continue
+            rows.append({**row, "course_id": course_id})
+        self._lessons = []
+
+        if rows:
+            # Returning the indexed columns means lessons need no parameter-order guarantee,
+            # which SQLite can only give one row per statement
+            inserted = db.execute(
+                insert(Lesson).returning(Lesson.id, Lesson.course_id, Lesson.title, Lesson.content), rows
+            ).all()
+            documents.extend(
+                {"course_id": r.course_id, "lesson_id": r.id, "title": r.title, "body": r.content} for r in inserted
+            )
+            self.lessons_by_course.update(row["course_id"] for row in rows)
+        search_controller.index_documents(db, documents)
+
+    def finish(self, db: Session, atomic: bool = False):
+        """Write what's left and commit, or roll everything back if `atomic` and any row failed."""
+        self.flush(db)
+        if atomic and self.error_count:
+            db.rollback()
+            return self.summary(committed=False)
+
+        for course_id, count in self.lessons_by_course.items():
+            completion_controller.on_lessons_added(db, course_id, count)
+        db.commit()
+
+        for course_id in self.lessons_by_course:
+            catalog_cache.invalidate(lessons_scope(course_id))
+            analytics_controller.invalidate(course_id)
+        if self.course_ids:
+            catalog_cache.invalidate(APPROVED_COURSES)
+        return self.summary(committed=True)
+
+    def summary(self, committed: bool):
+        return {
+            "committed": committed,
+            "rows": self.rows,
+            "courses_created": len(self.course_ids) if committed else 0,
+            "lessons_created": sum(self.lessons_by_course.values()) if committed else 0,
+            "course_refs": self.refs if committed else {},
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
@@ -1,12 +1,50 @@
 from sqlalchemy.orm import Session
 from app.models.lesson_model import Lesson
+from app.controllers import analytics_controller, completion_controller, search_controller
+from app.utils.catalog_cache import catalog_cache, lessons_scope
+from app.utils.serialization import row_serializer
+
+# Column projections for lesson lists; the outline never reads content
+LESSON_COLUMNS = (Lesson.id, Lesson.title, Lesson.content, Lesson.course_id)
+LESSON_OUTLINE_COLUMNS = (Lesson.id, Lesson.title, Lesson.course_id)
+serialize_lesson_row = row_serializer(LESSON_COLUMNS)
+serialize_lesson_outline_row = row_serializer(LESSON_OUTLINE_COLUMNS)
 
 def create_lesson(db: Session, title: str, content: str, course_id: int):
     lesson = Lesson(title=title, content=content, course_id=course_id)
     db.add(lesson)
+    db.flush()
+    completion_controller.on_lesson_added(db, lesson)
+    search_controller.index_lesson(db, lesson)
     db.commit()
     db.refresh(lesson)
+    catalog_cache.invalidate(lessons_scope(course_id))
+    analytics_controller.invalidate(course_id)
     return lesson
 
+def serialize_lesson(lesson):
+    return {
+        "id": lesson.id,
+        "title": lesson.title,
+        "content": lesson.content,
+        "course_id": lesson.course_id,
+    }
+
+def serialize_lesson_outline(lesson):
+    return {
+        "id": lesson.id,
+        "title": lesson.title,
+        "course_id": lesson.course_id,
+    }
+
+def query_lessons_by_course(db: Session, course_id: int):
+    return db.query(*LESSON_COLUMNS).filter(Lesson.course_id == course_id)
+
+def query_lesson_outline(db: Session, course_id: int):
+    return db.query(*LESSON_OUTLINE_COLUMNS).filter(Lesson.course_id == course_id)
+
+def get_lesson_row(db: Session, lesson_id: int):
+    return db.query(*LESSON_COLUMNS).filter(Lesson.id == lesson_id).first()
+
 def get_lessons_by_course(db: Session, course_id: int):
     return db.query(Lesson).filter(Lesson.course_id == course_id).all()
@@ -0,0 +1,226 @@
+"""
+Write-behind buffer for lesson completions.
+
+With PROGRESS_WRITE_BEHIND=true, `POST /students/complete-lesson` validates the
+lesson and enrollment, queues the completion here and answers straight away.
+A background thread writes queued completions in batches of up to
+PROGRESS_FLUSH_BATCH, as soon as that many are pending or every
+PROGRESS_FLUSH_INTERVAL_MS otherwise. Repeated (student, lesson) events
+coalesce into one write.
+
+Queued completions stay visible to the student's own progress, certificate and
+enrollment reads until their batch is committed. When a batch fails, its
+completions are retried one at a time, so a bad one cannot hold up the rest of
+the queue. A completion that keeps failing on its own is moved to a dead-letter
+list after PROGRESS_MAX_ATTEMPTS tries. Connection errors keep everything
+queued for the next flush. `stop` drains everything on shutdown. Once
+PROGRESS_BUFFER_MAX completions are pending, new ones are written
+synchronously instead.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from sqlalchemy.exc import InterfaceError, OperationalError
+from app.database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_WRITE_BEHIND = os.getenv("PROGRESS_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+PROGRESS_FLUSH_INTERVAL_MS = float(os.getenv("PROGRESS_FLUSH_INTERVAL_MS", "250"))
+PROGRESS_FLUSH_BATCH = int(os.getenv("PROGRESS_FLUSH_BATCH", "500"))
+PROGRESS_BUFFER_MAX = int(os.getenv("PROGRESS_BUFFER_MAX", "50000"))
+PROGRESS_MAX_ATTEMPTS = int(os.getenv("PROGRESS_MAX_ATTEMPTS", "5"))
+DEAD_LETTER_MAX = 1000
+
+# The database is unreachable, not the completion at fault: never dead-letter on these
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+QUEUED, PENDING, FULL = "queued", "pending", "full"
+
+
+class ProgressBuffer:
+    """Coalescing queue of completions, plus the thread that writes it out."""
+
+    def __init__(self, enabled: bool, interval: float, batch_size: int, max_pending: int,
+                 max_attempts: int = PROGRESS_MAX_ATTEMPTS):
+        self.enabled = enabled
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._events = {}  # (student_id, lesson_id) -> course_id, in arrival order
+        self._by_student = {}  # student_id -> {course_id: {lesson_id, ...}}
+        self._attempts = {}  # (student_id, lesson_id) -> failed single writes
+        self.dead_letters = deque(maxlen=DEAD_LETTER_MAX)  # (student_id, course_id, lesson_id, error)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stopping = False
+        self._thread = None
+        self._counts = {
+            "queued": 0, "coalesced": 0, "overflowed": 0, "written": 0, "batches": 0, "failures": 0, "dead_lettered": 0,
+        }
+        self._last_flush = None
+
+    def add(self, student_id: int, course_id: int, lesson_id: int) -> str:
+        """Queue a completion: QUEUED, PENDING (already queued) or FULL (caller writes it itself)."""
+        with self._lock:
+            key = (student_id, lesson_id)
+            if key in self._events:
+                self._counts["coalesced"] += 1
+                return PENDING
+            if len(self._events) >= self.max_pending:
+                self._counts["overflowed"] += 1
+                return FULL
+            self._events[key] = course_id
+            self._by_student.setdefault(student_id, {}).setdefault(course_id, set()).add(lesson_id)
+            self._counts["queued"] += 1
+            if len(self._events) >= self.batch_size:
+                self._wake.notify()
+            return QUEUED
+
+    def pending_lessons(self, student_id: int, course_id: int) -> frozenset:
+        with self._lock:
+            return frozenset(self._by_student.get(student_id, {}).get(course_id, ()))
+
+    def pending_by_course(self, student_id: int) -> dict:
+        """Queued lesson ids per course for one student."""
+        with self._lock:
+            return {course_id: frozenset(lessons) for course_id, lessons in self._by_student.get(student_id, {}).items()}
+
+    def flush(self) -> int:
+        """Write one batch of queued completions; returns how many left the queue."""
+        with self._lock:
+            batch = [
+                (student_id, course_id, lesson_id)
+                for (student_id, lesson_id), course_id in list(self._events.items())[: self.batch_size]
+            ]
+        if not batch:
+            return 0
+
+        # Events leave the queue only once committed, so reads never miss them
+        try:
+            _write(batch)
+            written, dead = batch, []
+        except _TRANSIENT_ERRORS:
+            raise
+        except Exception:
+            logger.exception("Progress write-behind batch of %d failed; retrying one at a time", len(batch))
+            written, dead = self._write_singly(batch)
+
+        with self._lock:
+            self._dequeue(written + [event for event, _ in dead])
+            for (student_id, course_id, lesson_id), error in dead:
+                self.dead_letters.append((student_id, course_id, lesson_id, error))
+            self._counts["written"] += len(written)
+            self._counts["dead_lettered"] += len(dead)
+            self._counts["batches"] += 1
+            self._last_flush = time.time()
+        return len(written) + len(dead)
+
+    def _write_singly(self, batch):
+        """Write each event on its own; returns (written, [(event, error) to dead-letter])."""
+        written, dead = [], []
+        for event in batch:
+            try:
+                _write([event])
+            except _TRANSIENT_ERRORS:
+                raise
+            except Exception as exc:
+                key = (event[0], event[2])
+                with self._lock:
+                    attempts = self._attempts[key] = self._attempts.get(key, 0) + 1
+                if attempts >= self.max_attempts:
+                    logger.error("Progress write-behind: dropping %s after %d failed attempts: %s", event, attempts, exc)
+                    dead.append((event, repr(exc)))
+            else:
+                written.append(event)
+        return written, dead
+
+    def _dequeue(self, events):
+        for student_id, course_id, lesson_id in events:
+            self._events.pop((student_id, lesson_id), None)
+            self._attempts.pop((student_id, lesson_id), None)
+            courses = self._by_student.get(student_id)
+            lessons = courses.get(course_id) if courses else None
+            if lessons is not None:
+                lessons.discard(lesson_id)
+                if not lessons:
+                    del courses[course_id]
+                    if not courses:
+                        del self._by_student[student_id]
+
+    def _drain(self) -> bool:
+        """Flush until less than a full batch is left; False if a flush failed."""
+        while True:
+            try:
+                if self.flush() < self.batch_size:
+                    return True
+            except Exception:
+                with self._lock:
+                    self._counts["failures"] += 1
+                logger.exception("Progress write-behind flush failed; %d completions still queued", self.size)
+                return False
+
+    def _run(self):
+        healthy = True
+        while True:
+            with self._lock:
+                # After a failure, wait out the interval even with a full batch queued
+                if not self._stopping and (not healthy or len(self._events) < self.batch_size):
+                    self._wake.wait(self.interval)
+                if self._stopping:
+                    return
+            healthy = self._drain()
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "pending": len(self._events),
+                "flush_interval_ms": self.interval * 1000,
+                "flush_batch": self.batch_size,
+                "max_pending": self.max_pending,
+                "max_attempts": self.max_attempts,
+                "dead_letters": len(self.dead_letters),
+                **self._counts,
+                "last_flush_age_seconds": round(time.time() - self._last_flush, 3) if self._last_flush else None,
+            }
+
+    def start(self):
+        if self.enabled and self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="progress-write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write everything still queued."""
+        with self._lock:
+            self._stopping = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        if not self._drain() or self.size:
+            logger.error("Progress write-behind: %d completions could not be written at shutdown", self.size)
+
+
+def _write(events):
+    from app.controllers.progress_controller import write_completions
+
+    with SessionLocal() as db:
+        write_completions(db, events)
+
+
+progress_buffer = ProgressBuffer(
+    enabled=PROGRESS_WRITE_BEHIND,
+    interval=PROGRESS_FLUSH_INTERVAL_MS / 1000,
+    batch_size=PROGRESS_FLUSH_BATCH,
+    max_pending=PROGRESS_BUFFER_MAX,
+)
@@ -1,41 +1,194 @@
 # app/controllers/progress_controller.py
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from app.models.progress_model import Progress
-from app.models.lesson_model import Lesson  # adjust import name if different
+from app.models.lesson_model import Lesson
+from app.models.enrollment import Enrollment
+from app.models.completion_model import CourseLessonCount, CompletionBitmap
+from app.database.dialect import dialect_insert
+from app.controllers import analytics_controller, completion_controller
+from app.controllers.progress_buffer import progress_buffer, PENDING, FULL
 
-def mark_lesson_complete(db: Session, student_id: int, course_id: int, lesson_id: int):
-    # find existing progress record
-    prog = db.query(Progress).filter(
-        Progress.student_id == student_id,
-        Progress.course_id == course_id,
-        Progress.lesson_id == lesson_id
-    ).one_or_none()
-
-    if prog:
-        prog.is_completed = True
+UPSERT_CHUNK_SIZE = 1000
+
+
+def complete_lessons(db: Session, student_id: int, lesson_ids: list[int], course_id: int | None = None):
+    """
+    Mark a batch of lessons completed for a student.
+
+    Lessons are validated (exist, student enrolled in their course) in one
+    query and written with a single INSERT ... ON CONFLICT DO UPDATE, so a
+    whole session's completions cost a handful of statements and never race
+    on the uix_progress constraint. With `course_id`, lessons from other
+    courses are reported as not found.
+    """
+    lesson_ids = list(dict.fromkeys(lesson_ids))
+    query = (
+        db.query(Lesson.id, Lesson.course_id, Lesson.title, Enrollment.id.label("enrollment_id"))
+        .outerjoin(
+            Enrollment,
+            and_(Enrollment.course_id == Lesson.course_id, Enrollment.student_id == student_id),
+        )
+        .filter(Lesson.id.in_(lesson_ids))
+    )
+    if course_id is not None:
+        query = query.filter(Lesson.course_id == course_id)
+    rows = query.all()
+    lessons = {row.id: row for row in rows}
+    not_found = [lesson_id for lesson_id in lesson_ids if lesson_id not in lessons]
+    not_enrolled = [lesson_id for lesson_id in lesson_ids if lesson_id in lessons and lessons[lesson_id].enrollment_id is None]
+    accepted = [lesson_id for lesson_id in lesson_ids if lesson_id in lessons and lessons[lesson_id].enrollment_id is not None]
+
+    result = {
+        "completed": [],
+        "newly_completed": [],
+        "queued": [],
+        "already_completed": [],
+        "not_found": not_found,
+        "not_enrolled": not_enrolled,
+        "titles": {lesson_id: lessons[lesson_id].title for lesson_id in accepted},
+    }
+    if not accepted:
+        return result
+
+    by_course = {}
+    for lesson_id in accepted:
+        by_course.setdefault(lessons[lesson_id].course_id, []).append(lesson_id)
+    for lesson_course_id, course_lesson_ids in by_course.items():
+        result["newly_completed"] += completion_controller.record_completions(
+            db, student_id, lesson_course_id, course_lesson_ids
+        )
+    newly = set(result["newly_completed"])
+    result["already_completed"] = [lesson_id for lesson_id in accepted if lesson_id not in newly]
+
+    insert = dialect_insert(db)
+    stmt = insert(Progress).values([
+        {
+            "student_id": student_id,
+            "course_id": lessons[lesson_id].course_id,
+            "lesson_id": lesson_id,
+            "is_completed": True,
+        }
+        for lesson_id in accepted
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "course_id", "lesson_id"],
+        set_={"is_completed": True},
+    ).returning(Progress.id, Progress.course_id, Progress.lesson_id)
+    written = db.execute(stmt).all()
+    db.commit()
+    for lesson_course_id in by_course:
+        analytics_controller.invalidate(lesson_course_id)
+
+    result["completed"] = [
+        {
+            "id": row.id,
+            "student_id": student_id,
+            "course_id": row.course_id,
+            "lesson_id": row.lesson_id,
+            "is_completed": True,
+        }
+        for row in written
+    ]
+    return result
+
+
+def record_lesson_completion(db: Session, student_id: int, lesson_id: int):
+    """
+    complete_lessons for one lesson, through the write-behind buffer when it
+    is enabled: one validating read, then the completion is queued. Same
+    result shape; a lesson that was only queued is reported in "queued", not
+    "newly_completed" or "completed".
+    """
+    if not progress_buffer.enabled:
+        return complete_lessons(db, student_id, [lesson_id])
+
+    row = (
+        db.query(
+            Lesson.course_id, Lesson.title, Enrollment.id.label("enrollment_id"),
+            CourseLessonCount.lesson_total, CompletionBitmap.bits,
+        )
+        .outerjoin(
+            Enrollment,
+            and_(Enrollment.course_id == Lesson.course_id, Enrollment.student_id == student_id),
+        )
+        .outerjoin(CourseLessonCount, CourseLessonCount.course_id == Lesson.course_id)
+        .outerjoin(
+            CompletionBitmap,
+            and_(CompletionBitmap.course_id == Lesson.course_id, CompletionBitmap.student_id == student_id),
+        )
+        .filter(Lesson.id == lesson_id)
+        .first()
+    )
+    result = {
+        "completed": [],
+        "newly_completed": [],
+        "queued": [],
+        "already_completed": [],
+        "not_found": [lesson_id] if row is None else [],
+        "not_enrolled": [lesson_id] if row is not None and row.enrollment_id is None else [],
+        "titles": {},
+    }
+    if row is None or row.enrollment_id is None:
+        return result
+
+    result["titles"][lesson_id] = row.title
+    if row.bits is None:
+        # No bitmap (enrolled before bitmaps were kept): Progress is the record
+        done = db.query(Progress.id).filter(
+            Progress.student_id == student_id, Progress.lesson_id == lesson_id, Progress.is_completed == True
+        ).first() is not None
     else:
-        prog = Progress(student_id=student_id, course_id=course_id, lesson_id=lesson_id, is_completed=True)
-        db.add(prog)
+        done = completion_controller.is_lesson_complete(db, row.course_id, row.lesson_total, row.bits, lesson_id)
+    if done:
+        result["already_completed"].append(lesson_id)
+        return result
+    outcome = progress_buffer.add(student_id, row.course_id, lesson_id)
+    if outcome == FULL:
+        return complete_lessons(db, student_id, [lesson_id])
+    result["already_completed" if outcome == PENDING else "queued"].append(lesson_id)
+    return result
+
 
+def write_completions(db: Session, events: list[tuple[int, int, int]]):
+    """
+    Persist already-validated (student_id, course_id, lesson_id) completions in
+    one transaction: bitmaps for every (student, course) pair, then chunked
+    multi-row upserts.
+    """
+    lessons_by_pair = {}
+    for student_id, course_id, lesson_id in events:
+        lessons_by_pair.setdefault((student_id, course_id), []).append(lesson_id)
+    completion_controller.record_completions_bulk(db, lessons_by_pair)
+
+    insert = dialect_insert(db)
+    rows = [
+        {"student_id": student_id, "course_id": course_id, "lesson_id": lesson_id, "is_completed": True}
+        for student_id, course_id, lesson_id in events
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        db.execute(
+            insert(Progress).values(rows[start : start + UPSERT_CHUNK_SIZE]).on_conflict_do_update(
+                index_elements=["student_id", "course_id", "lesson_id"],
+                set_={"is_completed": True},
+            )
+        )
     db.commit()
-    db.refresh(prog)
-    return prog
+    for course_id in {course_id for _, course_id in lessons_by_pair}:
+        analytics_controller.invalidate(course_id)
 
-def get_progress_for_course(db: Session, student_id: int, course_id: int):
-    # get total lessons in course
-    total_lessons = db.query(Lesson).filter(Lesson.course_id == course_id).count()
 
-    # get completed lesson ids
-    completed = db.query(Progress).filter(
-        Progress.student_id == student_id,
-        Progress.course_id == course_id,
-        Progress.is_completed == True
-    ).all()
+def mark_lesson_complete(db: Session, student_id: int, course_id: int, lesson_id: int):
+    """Single-lesson wrapper around complete_lessons."""
+    return complete_lessons(db, student_id, [lesson_id], course_id=course_id)
 
-    completed_ids = [p.lesson_id for p in completed]
+
+def get_progress_for_course(db: Session, student_id: int, course_id: int):
+    # single-row lookup of the cached lesson total and completion bitmap
+    total_lessons, bits = completion_controller.get_completion(db, student_id, course_id)
 
     return {
         "course_id": course_id,
-        "completed_lessons": completed_ids,
+        "completed_lessons": completion_controller.completed_lesson_ids(db, course_id, total_lessons, bits),
         "total_lessons": total_lessons,
     }
@@ -0,0 +1,142 @@
+"""
+Full-text search over courses and their lessons.
+
+`search_index` holds one document per course (title + description) and one
+per lesson (title + content). SQLite uses an FTS5 table ranked with bm25;
+PostgreSQL stores a weighted tsvector behind a GIN index and ranks with
+ts_rank. Titles weigh more than bodies. The table is created by migration 3
+and kept current by the course and lesson controllers.
+"""
+import re
+from sqlalchemy import column, text
+from sqlalchemy.orm import Session
+
+# bm25 column weights (title, body) for FTS5
+_FTS_WEIGHTS = "bm25(10.0, 1.0)"
+_MAX_TERMS = 16
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def _dialect(db) -> str:
+    # Works for a Session and for the raw Connection a migration runs on. A
+    # session's own bind, because get_bind() without a statement pins a
+    # read session to the primary
+    bind = db if hasattr(db, "dialect") else (db.bind or db.get_bind())
+    return bind.dialect.name
+
+
+def index_documents(db, documents: list[dict]):
+    """
+    Add course and lesson documents in one executemany (caller commits).
+    Each document has course_id, lesson_id (None for a course), title and body.
+    """
+    if not documents:
+        return
+    params = [
+        {"course_id": d["course_id"], "lesson_id": d["lesson_id"], "title": d["title"] or "", "body": d["body"] or ""}
+        for d in documents
+    ]
+    if _dialect(db) == "postgresql":
+        db.execute(text(
+            "INSERT INTO search_index (course_id, lesson_id, document) VALUES (:course_id, :lesson_id, "
+            "setweight(to_tsvector('english', :title), 'A') || setweight(to_tsvector('english', :body), 'B'))"
+        ), params)
+    else:
+        db.execute(text(
+            "INSERT INTO search_index (title, body, course_id, lesson_id) VALUES (:title, :body, :course_id, :lesson_id)"
+        ), params)
+
+
+def index_document(db, course_id: int, lesson_id: int | None, title: str, body: str | None):
+    """Add one course or lesson document (caller commits)."""
+    index_documents(db, [{"course_id": course_id, "lesson_id": lesson_id, "title": title, "body": body}])
+
+
+def index_course(db, course):
+    index_document(db, course.id, None, course.title, course.description)
+
+
+def index_lesson(db, lesson):
+    index_document(db, lesson.course_id, lesson.id, lesson.title, lesson.content)
+
+
+def rebuild_index(db):
+    """Repopulate the whole index from courses and lessons in two set-based statements."""
+    db.execute(text("DELETE FROM search_index"))
+    if _dialect(db) == "postgresql":
+        document = "setweight(to_tsvector('english', coalesce({t}, '')), 'A') || setweight(to_tsvector('english', coalesce({b}, '')), 'B')"
+        db.execute(text(
+            "INSERT INTO search_index (course_id, lesson_id, document) "
+            f"SELECT id, NULL, {document.format(t='title', b='description')} FROM courses"
+        ))
+        db.execute(text(
+            "INSERT INTO search_index (course_id, lesson_id, document) "
+            f"SELECT course_id, id, {document.format(t='title', b='content')} FROM lessons"
+        ))
+    else:
+        db.execute(text(
+            "INSERT INTO search_index (title, body, course_id, lesson_id) "
+            "SELECT title, coalesce(description, ''), id, NULL FROM courses"
+        ))
+        db.execute(text(
+            "INSERT INTO search_index (title, body, course_id, lesson_id) "
+            "SELECT title, content, course_id, id FROM lessons"
+        ))
+
+
+def _fts5_query(q: str) -> str | None:
+    """Quote each term so user input can't use FTS5 syntax; the last term matches as a prefix."""
+    terms = _TERM.findall(q)[:_MAX_TERMS]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_courses(db: Session, q: str, offset: int = 0, limit: int = 20):
+    """
+    Approved courses matching `q`, best first. A course scores by its best
+    matching document. Returns (items, has_more).
+    """
+    if _dialect(db) == "postgresql":
+        hits = (
+            "SELECT s.course_id, max(ts_rank(s.document, query)) AS score "
+            "FROM search_index s, websearch_to_tsquery('english', :q) AS query "
+            "WHERE s.document @@ query GROUP BY s.course_id"
+        )
+        params = {"q": q}
+    else:
+        match = _fts5_query(q)
+        if match is None:
+            return [], False
+        hits = (
+            "SELECT course_id, -min(rank) AS score FROM search_index "
+            f"WHERE search_index MATCH :q AND rank MATCH '{_FTS_WEIGHTS}' GROUP BY course_id"
+        )
+        params = {"q": match}
+
+    # .columns() makes it a SELECT the read session can send to a replica
+    rows = db.execute(text(
+        f"WITH hits AS ({hits}) "
+        "SELECT c.id, c.title, c.description, c.creator_id, c.is_approved, hits.score "
+        "FROM hits JOIN courses c ON c.id = hits.course_id "
+        "WHERE c.is_approved = :approved "
+        "ORDER BY hits.score DESC, c.id "
+        "LIMIT :limit OFFSET :offset"
+    ).columns(
+        column("id"), column("title"), column("description"), column("creator_id"), column("is_approved"), column("score")
+    ), {**params, "approved": True, "limit": limit + 1, "offset": offset}).all()
+
+    items = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "creator_id": row.creator_id,
+            "is_approved": bool(row.is_approved),
+            "score": float(row.score),
+        }
+        for row in rows[:limit]
+    ]
+    return items, len(rows) > limit
@@ -0,0 +1,107 @@
+import os
+import time
+import logging
+import threading
+from sqlalchemy import func, literal, select, union_all, cast, String
+from sqlalchemy.orm import Session
+from app.database.routing import ReadSessionLocal
+from app.models.user_model import User
+from app.models.course_model import Course
+from app.models.enrollment import Enrollment
+
+logger = logging.getLogger(__name__)
+
+STATS_REFRESH_SECONDS = float(os.getenv("STATS_REFRESH_SECONDS", "60"))
+
+
+def compute_admin_stats(db: Session):
+    """
+    Dashboard counts from a single statement: one grouped pass per table,
+    glued together with UNION ALL, then folded into totals here.
+    """
+    stmt = union_all(
+        select(literal("users").label("kind"), User.role.label("key"), func.count().label("n"))
+        .group_by(User.role),
+        select(literal("courses"), cast(Course.is_approved, String), func.count())
+        .group_by(Course.is_approved),
+        select(literal("enrollments"), literal(None, String), func.count())
+        .select_from(Enrollment),
+    )
+    users_by_role = {}
+    courses_by_approval = {}
+    total_enrollments = 0
+    for kind, key, n in db.execute(stmt):
+        if kind == "users":
+            users_by_role[key or "unknown"] = n
+        elif kind == "courses":
+            courses_by_approval[key] = n
+        else:
+            total_enrollments = n
+
+    approved = sum(n for key, n in courses_by_approval.items() if key in ("1", "true"))
+    return {
+        "total_users": sum(users_by_role.values()),
+        "total_courses": sum(courses_by_approval.values()),
+        "approved_courses": approved,
+        "total_enrollments": total_enrollments,
+        "users_by_role": users_by_role,
+    }
+
+
+class StatsSnapshot:
+    """
+    Holds the latest admin stats and refreshes them on a background thread,
+    so dashboard loads never hit the database. Without a running refresher
+    (interval 0, or before start), reads recompute once the snapshot is
+    older than the interval.
+    """
+
+    def __init__(self, interval: float = STATS_REFRESH_SECONDS):
+        self.interval = interval
+        self._stats = None
+        self._taken_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self, db: Session | None = None):
+        if db is None:
+            with ReadSessionLocal() as session:
+                stats = compute_admin_stats(session)
+        else:
+            stats = compute_admin_stats(db)
+        with self._lock:
+            self._stats = stats
+            self._taken_at = time.time()
+        return stats
+
+    def get(self, db: Session):
+        """Return (stats, age in seconds); computes on the spot if there is no current snapshot."""
+        with self._lock:
+            stats, taken_at = self._stats, self._taken_at
+        if stats is None or (self._thread is None and time.time() - taken_at >= self.interval):
+            stats = self.refresh(db)
+            taken_at = self._taken_at
+        return stats, time.time() - taken_at
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Admin stats refresh failed")
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="admin-stats", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+admin_stats = StatsSnapshot()
@@ -3,8 +3,9 @@ from app.models.user_model import User
 from app.schemas.user_schema import UserCreate
 from app.utils.hashing import hash_password
 
-def create_user(db: Session, user_in: UserCreate):
-    hashed = hash_password(user_in.password)
+def create_user(db: Session, user_in: UserCreate, hashed: str | None = None):
+    # Routes pass a hash computed off the request path; hash inline otherwise
+    hashed = hashed or hash_password(user_in.password)
     user = User(email=user_in.email, name=user_in.name, role=user_in.role, password_hash=hashed)
     db.add(user)
     db.commit()
@@ -13,3 +14,7 @@ def create_user(db: Session, user_in: UserCreate):
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
+
+def update_password_hash(db: Session, user_id: int, new_hash: str):
+    db.query(User).filter(User.id == user_id).update({User.password_hash: new_hash}, synchronize_session=False)
+    db.commit()
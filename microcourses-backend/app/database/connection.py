@@ -1,5 +1,6 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -13,16 +14,32 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("❌ DATABASE_URL not found in environment variables!")
 
+# ✅ DATABASE_ASYNC=true serves the async routes from an AsyncEngine
+# (asyncpg for PostgreSQL, aiosqlite for the local SQLite setup)
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# ✅ DATABASE_REPLICA_URLS: comma-separated read replicas of DATABASE_URL (see app/database/routing.py)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+_url = make_url(DATABASE_URL)
+
+
 # ✅ Create SQLAlchemy Engine for Production (Neon + Render)
 # pool_pre_ping = ensures old connections are refreshed automatically
 # pool_recycle = recreates connection every 30 minutes (to prevent timeout)
-# connect_args = enforces SSL for Neon PostgreSQL
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-    connect_args={"sslmode": "require"},
-)
+# connect_args = enforces SSL for Neon PostgreSQL (SQLite takes no SSL options)
+def _engine(url):
+    sqlite = make_url(url).get_backend_name() == "sqlite"
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        connect_args={"check_same_thread": False} if sqlite else {"sslmode": "require"},
+    )
+
+
+engine = _engine(DATABASE_URL)
+replica_engines = [_engine(url) for url in DATABASE_REPLICA_URLS]
 
 # ✅ Create a configured SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -30,14 +47,35 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # ✅ Base class for all database models
 Base = declarative_base()
 
-# ✅ Dependency for FastAPI routes to get DB session
-def get_db():
-    """
-    Provides a database session for routes.
-    Automatically closes the session after use.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+def _async_engine(url):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if url.get_backend_name() == "sqlite":
+        return create_async_engine(url.set(drivername="sqlite+aiosqlite"))
+    # asyncpg takes SSL via connect_args, not libpq query parameters
+    return create_async_engine(
+        url.set(drivername="postgresql+asyncpg", query={}),
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        connect_args={"ssl": "require"},
+    )
+
+
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.utils.profiling import anchored
+
+    class _AsyncSession(AsyncSession):
+        # Greenlet frames don't link back to the request, so mark controller calls for the profiler
+        async def run_sync(self, fn, *args, **kwargs):
+            return await super().run_sync(anchored(fn), *args, **kwargs)
+
+    async_engine = _async_engine(_url)
+    async_replica_engines = [_async_engine(make_url(url)) for url in DATABASE_REPLICA_URLS]
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=_AsyncSession, autoflush=False, expire_on_commit=False
+    )
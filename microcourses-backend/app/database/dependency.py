@@ -1,8 +1,71 @@
-from app.database.connection import SessionLocal
+from starlette.concurrency import run_in_threadpool
+from app.database.connection import SessionLocal, AsyncSessionLocal, DATABASE_ASYNC
+from app.database.routing import ReadSessionLocal, AsyncReadSessionLocal
+from app.utils.profiling import anchored
+
 
 def get_db():
+    """
+    Provides a blocking database session for sync routes.
+    Automatically closes the session after use.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """get_db for read-only routes: SELECTs may be served by a read replica."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class ThreadedSession:
+    """
+    Async facade over a sync Session, used when DATABASE_ASYNC is off.
+    Offers the same `run_sync` entry point as AsyncSession, running the
+    work in the threadpool instead of on the event loop.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(anchored(fn), self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+async def get_async_db():
+    """
+    Provides a session for `async def` routes. Controllers stay sync and are
+    called with `await db.run_sync(controller_fn, *args)`.
+    """
+    if DATABASE_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        session = ThreadedSession(SessionLocal())
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_async_read_db():
+    """get_async_db for read-only routes: SELECTs may be served by a read replica."""
+    if DATABASE_ASYNC:
+        async with AsyncReadSessionLocal() as session:
+            yield session
+    else:
+        session = ThreadedSession(ReadSessionLocal())
+        try:
+            yield session
+        finally:
+            await session.close()
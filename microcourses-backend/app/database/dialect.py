@@ -0,0 +1,10 @@
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session):
+    """The session's dialect `insert`, which adds ON CONFLICT (on_conflict_do_nothing / _do_update)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
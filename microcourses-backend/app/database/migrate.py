@@ -0,0 +1,264 @@
+"""
+Versioned schema migrations.
+
+Run as a separate deploy step, before starting the app:
+    python -m app.database.migrate            # apply pending migrations
+    python -m app.database.migrate --status   # show applied / pending versions
+
+Each migration runs in its own transaction and is recorded in the
+`schema_migrations` table. DDL uses IF NOT EXISTS so a migration is safe
+on databases whose tables were created by an older `create_all`.
+Migrations are frozen: they use fixed SQL only, never models or controller
+code, so a version does the same thing whenever it runs.
+"""
+import sys
+import argparse
+from datetime import datetime
+from typing import Callable, NamedTuple
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Integer, LargeBinary, MetaData, String, Table, Text,
+    UniqueConstraint, select, text,
+)
+from app.database.connection import engine
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable
+
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# The schema as the app created it at import time (Base.metadata.create_all), before
+# versioned migrations existed. Frozen: model changes since then are later migrations,
+# so fresh and upgraded databases reach each version through the same DDL.
+_baseline_meta = MetaData()
+Table(
+    "users", _baseline_meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("name", String),
+    Column("password_hash", String, nullable=False),
+    Column("role", String),
+    Column("is_active", Boolean),
+)
+Table(
+    "courses", _baseline_meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String, nullable=False),
+    Column("description", String),
+    Column("creator_id", Integer, ForeignKey("users.id")),
+    Column("is_approved", Boolean),
+)
+Table(
+    "lessons", _baseline_meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(255), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("course_id", Integer, ForeignKey("courses.id"), nullable=False),
+)
+Table(
+    "enrollments", _baseline_meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("student_id", Integer, ForeignKey("users.id")),
+    Column("course_id", Integer, ForeignKey("courses.id")),
+    Column("completed", Boolean),
+)
+Table(
+    "progress", _baseline_meta,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("student_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("course_id", Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+    Column("lesson_id", Integer, ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False),
+    Column("is_completed", Boolean, nullable=False),
+    UniqueConstraint("student_id", "course_id", "lesson_id", name="uix_progress"),
+)
+Table(
+    "course_lesson_counts", _baseline_meta,
+    Column("course_id", Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+    Column("lesson_total", Integer, nullable=False),
+)
+Table(
+    "completion_bitmaps", _baseline_meta,
+    Column("student_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("course_id", Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+    Column("bits", LargeBinary, nullable=False),
+)
+
+
+def _baseline(conn):
+    """Tables as the app used to create them at import time (existing tables are left alone)."""
+    _baseline_meta.create_all(bind=conn, checkfirst=True)
+
+
+def _hot_path_indexes(conn):
+    """Composite indexes for the hot queries, plus one enrollment per (student, course)."""
+    # Keep the oldest row of any duplicate enrollment so the unique index can be built
+    conn.execute(text(
+        "DELETE FROM enrollments WHERE id NOT IN "
+        "(SELECT MIN(id) FROM enrollments GROUP BY student_id, course_id)"
+    ))
+    for ddl in [
+        "CREATE UNIQUE INDEX IF NOT EXISTS uix_enrollment ON enrollments (student_id, course_id)",
+        "CREATE INDEX IF NOT EXISTS ix_progress_student_course_completed ON progress (student_id, course_id, is_completed)",
+        "CREATE INDEX IF NOT EXISTS ix_progress_course_completed ON progress (course_id, is_completed)",
+        "CREATE INDEX IF NOT EXISTS ix_courses_is_approved_id ON courses (is_approved, id)",
+        "CREATE INDEX IF NOT EXISTS ix_courses_creator_id ON courses (creator_id)",
+        "CREATE INDEX IF NOT EXISTS ix_lessons_course_id_id ON lessons (course_id, id)",
+    ]:
+        conn.execute(text(ddl))
+
+
+def _search_index(conn):
+    """Full-text index over course and lesson text (FTS5 on SQLite, tsvector + GIN on PostgreSQL)."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_index ("
+            "id SERIAL PRIMARY KEY, "
+            "course_id INTEGER NOT NULL REFERENCES courses (id) ON DELETE CASCADE, "
+            "lesson_id INTEGER REFERENCES lessons (id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_search_index_course_id ON search_index (course_id)"))
+        document = (
+            "setweight(to_tsvector('english', coalesce({t}, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce({b}, '')), 'B')"
+        )
+        populate = [
+            "INSERT INTO search_index (course_id, lesson_id, document) "
+            f"SELECT id, NULL, {document.format(t='title', b='description')} FROM courses",
+            "INSERT INTO search_index (course_id, lesson_id, document) "
+            f"SELECT course_id, id, {document.format(t='title', b='content')} FROM lessons",
+        ]
+    else:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "title, body, course_id UNINDEXED, lesson_id UNINDEXED, tokenize = 'porter unicode61')"
+        ))
+        populate = [
+            "INSERT INTO search_index (title, body, course_id, lesson_id) "
+            "SELECT title, coalesce(description, ''), id, NULL FROM courses",
+            "INSERT INTO search_index (title, body, course_id, lesson_id) "
+            "SELECT title, content, course_id, id FROM lessons",
+        ]
+    conn.execute(text("DELETE FROM search_index"))
+    for dml in populate:
+        conn.execute(text(dml))
+
+
+def _enrollment_course_index(conn):
+    """Per-course enrollment scans for the creator analytics funnel."""
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollments_course_id_student_id ON enrollments (course_id, student_id)"
+    ))
+
+
+def _completion_backfill(conn):
+    """
+    Lesson totals for every course and a completion bitmap for every
+    enrollment, so progress reads never have to build them. Bit n is the
+    course's n-th lesson by id; bitmaps of students who aren't enrolled are
+    dropped.
+    """
+    conn.execute(text(
+        "INSERT INTO course_lesson_counts (course_id, lesson_total) "
+        "SELECT courses.id, COUNT(lessons.id) FROM courses "
+        "LEFT JOIN lessons ON lessons.course_id = courses.id "
+        "WHERE NOT EXISTS (SELECT 1 FROM course_lesson_counts n WHERE n.course_id = courses.id) "
+        "GROUP BY courses.id"
+    ))
+    conn.execute(text(
+        "DELETE FROM completion_bitmaps WHERE NOT EXISTS (SELECT 1 FROM enrollments e "
+        "WHERE e.student_id = completion_bitmaps.student_id AND e.course_id = completion_bitmaps.course_id)"
+    ))
+    missing = {}
+    for course_id, student_id in conn.execute(text(
+        "SELECT DISTINCT e.course_id, e.student_id FROM enrollments e "
+        "WHERE e.student_id IS NOT NULL AND e.course_id IS NOT NULL AND NOT EXISTS ("
+        "SELECT 1 FROM completion_bitmaps b WHERE b.student_id = e.student_id AND b.course_id = e.course_id)"
+    )):
+        missing.setdefault(course_id, []).append(student_id)
+
+    for course_id, student_ids in missing.items():
+        params = {"course_id": course_id}
+        lessons = conn.execute(text("SELECT id FROM lessons WHERE course_id = :course_id ORDER BY id"), params)
+        index = {lesson_id: position for position, (lesson_id,) in enumerate(lessons)}
+        bits = dict.fromkeys(student_ids, 0)
+        completed = conn.execute(
+            text("SELECT student_id, lesson_id FROM progress WHERE course_id = :course_id AND is_completed = :done"),
+            {**params, "done": True},
+        )
+        for student_id, lesson_id in completed:
+            if student_id in bits and lesson_id in index:
+                bits[student_id] |= 1 << index[lesson_id]
+        conn.execute(
+            text("INSERT INTO completion_bitmaps (student_id, course_id, bits) VALUES (:student_id, :course_id, :bits)"),
+            [{"student_id": student_id, "course_id": course_id,
+              "bits": value.to_bytes((value.bit_length() + 7) // 8, "little")}
+             for student_id, value in bits.items()],
+        )
+
+
+MIGRATIONS = [
+    Migration(1, "baseline schema", _baseline),
+    Migration(2, "hot-path composite indexes and unique enrollments", _hot_path_indexes),
+    Migration(3, "full-text search index over courses and lessons", _search_index),
+    Migration(4, "enrollments by course index", _enrollment_course_index),
+    Migration(5, "backfill lesson totals and completion bitmaps", _completion_backfill),
+]
+
+
+def applied_versions(bind=engine) -> set[int]:
+    _meta.create_all(bind=bind, checkfirst=True)
+    with bind.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def migrate(bind=engine, target: int | None = None) -> list[int]:
+    """Apply pending migrations in order (up to `target`); returns the versions applied."""
+    done = applied_versions(bind)
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in done or (target is not None and migration.version > target):
+            continue
+        with bind.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.utcnow(),
+            ))
+        applied.append(migration.version)
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        done = applied_versions()
+        for migration in MIGRATIONS:
+            state = "applied" if migration.version in done else "pending"
+            print(f"{migration.version:>4}  {state:<8} {migration.description}")
+        return 0
+
+    applied = migrate(target=args.target)
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
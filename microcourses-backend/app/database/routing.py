@@ -0,0 +1,182 @@
+"""
+Read/write session routing.
+
+Read-only routes take their session from `get_read_db` / `get_async_read_db`.
+Those sessions send plain SELECTs to one of the DATABASE_REPLICA_URLS, picked
+round-robin among the healthy ones when the session first reads, and send
+everything else (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw
+SQL) to the primary. Once a session has used the primary it stays there, so
+a request always reads its own writes; `use_primary` pins a session before
+reads that feed a write or a shared cache. Write routes keep `get_db` / `get_async_db`, which
+only ever see the primary.
+
+A health thread runs `SELECT 1` on every replica each REPLICA_HEALTH_INTERVAL
+seconds, and a disconnect error marks a replica down immediately. Without a
+healthy replica, reads go to the primary. Reads in a later request may lag
+the primary by the replication delay.
+"""
+import os
+import logging
+import threading
+from itertools import count
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, sessionmaker
+from app.database.connection import (
+    AsyncSessionLocal,
+    SessionLocal,
+    async_engine,
+    async_replica_engines,
+    engine,
+    replica_engines,
+)
+
+logger = logging.getLogger(__name__)
+
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+
+_PRIMARY = "routing_primary"
+_REPLICA = "routing_replica"
+
+
+class ReplicaSet:
+    """Health state and round-robin choice over the replicas, shared by the sync and async sessions."""
+
+    def __init__(self, engines, interval: float):
+        self.engines = engines
+        self.interval = interval
+        self.healthy = [True] * len(engines)
+        self.reads = [0] * len(engines)
+        self.fallbacks = 0
+        self._next = count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def choose(self) -> int | None:
+        """Index of the next healthy replica, or None to read from the primary."""
+        with self._lock:
+            candidates = [i for i, ok in enumerate(self.healthy) if ok]
+            if not candidates:
+                self.fallbacks += 1
+                return None
+            index = candidates[next(self._next) % len(candidates)]
+            self.reads[index] += 1
+            return index
+
+    def mark(self, index: int, healthy: bool):
+        with self._lock:
+            changed = self.healthy[index] != healthy
+            self.healthy[index] = healthy
+        if changed:
+            log = logger.info if healthy else logger.warning
+            log("Read replica %d is %s", index, "back up" if healthy else "down")
+
+    def check(self):
+        for index, replica in enumerate(self.engines):
+            try:
+                with replica.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception:
+                self.mark(index, False)
+            else:
+                self.mark(index, True)
+
+    def watch(self, index: int, replica):
+        """Mark a replica down as soon as one of its connections is found dead."""
+        def on_error(context):
+            if context.is_disconnect:
+                self.mark(index, False)
+
+        event.listen(replica, "handle_error", on_error)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None and self.engines and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "replicas": [
+                    {"index": i, "url": replica.url.render_as_string(hide_password=True),
+                     "healthy": self.healthy[i], "sessions": self.reads[i]}
+                    for i, replica in enumerate(self.engines)
+                ],
+                "primary_fallbacks": self.fallbacks,
+                "health_interval_seconds": self.interval,
+            }
+
+
+replicas = ReplicaSet(replica_engines, REPLICA_HEALTH_INTERVAL)
+for _index, _replica in enumerate(replica_engines):
+    replicas.watch(_index, _replica)
+for _index, _replica in enumerate(async_replica_engines):
+    replicas.watch(_index, _replica.sync_engine)
+
+
+def _is_read(clause) -> bool:
+    return getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    """Session whose plain reads go to the replica chosen for it; see the module docstring."""
+
+    primary = None
+    replica_binds = ()
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get(_PRIMARY) or self._flushing or not _is_read(clause):
+            self.info[_PRIMARY] = True
+            return self.primary
+        if _REPLICA not in self.info:
+            self.info[_REPLICA] = replicas.choose()
+        index = self.info[_REPLICA]
+        return self.primary if index is None else self.replica_binds[index]
+
+    def execute(self, statement, params=None, *, bind_arguments=None, **kw):
+        # ORM-enabled compound selects (UNION of entity columns) reach get_bind without their clause
+        bind_arguments = {"clause": statement, **(bind_arguments or {})}
+        return super().execute(statement, params, bind_arguments=bind_arguments, **kw)
+
+
+def _routing_session(primary, replica_binds):
+    return type("RoutingSession", (RoutingSession,), {"primary": primary, "replica_binds": replica_binds})
+
+
+def use_primary(db) -> bool:
+    """
+    Send the rest of this session's statements to the primary. Returns True
+    if the session had been reading from a replica, i.e. what it read so far
+    may be behind the primary. Takes a Session or the async wrapper of one.
+    """
+    db = getattr(db, "sync_session", db)
+    if not isinstance(db, RoutingSession) or db.info.get(_PRIMARY):
+        return False
+    db.info[_PRIMARY] = True
+    return db.info.get(_REPLICA) is not None
+
+
+ReadSessionLocal = SessionLocal
+AsyncReadSessionLocal = AsyncSessionLocal
+if replica_engines:
+    ReadSessionLocal = sessionmaker(
+        class_=_routing_session(engine, replica_engines), autocommit=False, autoflush=False, bind=engine
+    )
+    if AsyncSessionLocal is not None:
+        _AsyncRoutingSession = _routing_session(
+            async_engine.sync_engine, [replica.sync_engine for replica in async_replica_engines]
+        )
+
+        def AsyncReadSessionLocal():
+            return AsyncSessionLocal(sync_session_class=_AsyncRoutingSession)
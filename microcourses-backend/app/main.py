@@ -1,6 +1,9 @@
-from fastapi import FastAPI
+import os
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database.connection import Base, engine
+from fastapi.responses import PlainTextResponse
 from app.routes import (
     user_routes,
     auth_routes,
@@ -12,14 +15,42 @@ from app.routes import (
     student_routes,
     certificate_routes,
 )
+from app.database import connection
+from app.utils.auth_jwt import principal_from_authorization
+from app.utils.metrics import MetricsMiddleware, install_sql_hooks, render_metrics
+from app.utils.profiling import PROFILING_ENABLED, ProfilingMiddleware
+
+# ✅ Schema changes run as a separate step: python -m app.database.migrate
+
+
+# ✅ Background workers live as long as the app: the admin stats snapshot refresh,
+# the progress write-behind flusher and read replica health checks
+@asynccontextmanager
+async def background_workers(app: FastAPI):
+    from app.controllers.stats_controller import admin_stats
+    from app.controllers.progress_buffer import progress_buffer
+    from app.database.routing import replicas
+    admin_stats.start()
+    progress_buffer.start()
+    replicas.start()
+    try:
+        yield
+    finally:
+        from app.utils.certificate_pdf import shutdown_render_pool
+        from app.utils.hashing import shutdown_hash_pool
+        admin_stats.stop()
+        # Drain queued completions before the process exits
+        progress_buffer.stop()
+        replicas.stop()
+        shutdown_render_pool()
+        shutdown_hash_pool()
 
-# ✅ Create tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="MicroCourses LMS",
     description="Learning Management System Backend using FastAPI 🚀",
     version="1.0.0",
+    lifespan=background_workers,
 )
 
 # ✅ Allow frontend (React) to access backend (CORS)
@@ -36,8 +67,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-After", "ETag", "Content-Range", "Accept-Ranges", "X-Profile-Id"],
 )
 
+# ✅ On-demand request profiling (only installed when PROFILING_ENABLED is set)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# ✅ Per-route latency, in-flight and SQL-per-request metrics (added last, so it wraps CORS too)
+app.add_middleware(MetricsMiddleware)
+install_sql_hooks(connection.engine)
+if connection.async_engine is not None:
+    install_sql_hooks(connection.async_engine.sync_engine)
+for replica in connection.replica_engines:
+    install_sql_hooks(replica)
+for replica in connection.async_replica_engines:
+    install_sql_hooks(replica.sync_engine)
+
 # ✅ Include routes
 app.include_router(user_routes.router)
 app.include_router(auth_routes.router)
@@ -49,6 +95,29 @@ app.include_router(student_routes.router)
 app.include_router(progress_routes.router)
 app.include_router(certificate_routes.router)
 
+# ✅ Prometheus scrape endpoint: "Authorization: Bearer <METRICS_TOKEN>" when a token
+# is configured, otherwise an admin's access token
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+async def metrics_access(request: Request):
+    authorization = request.headers.get("authorization", "")
+    if METRICS_TOKEN:
+        if not secrets.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return
+    principal = await principal_from_authorization(authorization)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if principal.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can access this resource")
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(metrics_access)])
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # ✅ Root
 @app.get("/")
 def home():
@@ -0,0 +1,22 @@
+# app/models/completion_model.py
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from app.database.connection import Base
+
+class CourseLessonCount(Base):
+    """Cached number of lessons in a course, maintained when lessons are added."""
+    __tablename__ = "course_lesson_counts"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    lesson_total = Column(Integer, nullable=False, default=0)
+
+
+class CompletionBitmap(Base):
+    """
+    Completed lessons of one student in one course, one bit per lesson.
+    Bit N belongs to the course's Nth lesson ordered by lesson id.
+    """
+    __tablename__ = "completion_bitmaps"
+
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    bits = Column(LargeBinary, nullable=False, default=b"")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database.connection import Base
 
@@ -15,3 +15,9 @@ class Course(Base):
     lessons = relationship("Lesson", back_populates="course", cascade="all, delete-orphan")
 
     creator = relationship("User")
+
+    # (is_approved, id) serves the approved/pending catalog pages in keyset order
+    __table_args__ = (
+        Index("ix_courses_is_approved_id", "is_approved", "id"),
+        Index("ix_courses_creator_id", "creator_id"),
+    )
@@ -1,5 +1,5 @@
 # app/models/enrollment.py
-from sqlalchemy import Column, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, Boolean, Index
 from app.database.connection import Base
 
 class Enrollment(Base):
@@ -8,3 +8,10 @@ class Enrollment(Base):
     student_id = Column(Integer, ForeignKey("users.id"))
     course_id = Column(Integer, ForeignKey("courses.id"))
     completed = Column(Boolean, default=False)
+
+    # one enrollment per student and course; also serves (student_id, course_id) lookups
+    __table_args__ = (
+        Index("uix_enrollment", "student_id", "course_id", unique=True),
+        # a course's students, for the creator analytics funnel
+        Index("ix_enrollments_course_id_student_id", "course_id", "student_id"),
+    )
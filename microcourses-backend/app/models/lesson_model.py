@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database.connection import Base
 
@@ -12,3 +12,5 @@ class Lesson(Base):
 
     # Relationship
     course = relationship("Course", back_populates="lessons")
+
+    __table_args__ = (Index("ix_lessons_course_id_id", "course_id", "id"),)
@@ -1,5 +1,5 @@
 # app/models/progress_model.py
-from sqlalchemy import Column, Integer, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, UniqueConstraint, Index
 from app.database.connection import Base
 
 class Progress(Base):
@@ -12,4 +12,8 @@ class Progress(Base):
     is_completed = Column(Boolean, default=False, nullable=False)
 
     # prevent duplicate entries for same student-course-lesson
-    __table_args__ = (UniqueConstraint("student_id", "course_id", "lesson_id", name="uix_progress"),)
+    __table_args__ = (
+        UniqueConstraint("student_id", "course_id", "lesson_id", name="uix_progress"),
+        Index("ix_progress_student_course_completed", "student_id", "course_id", "is_completed"),
+        Index("ix_progress_course_completed", "course_id", "is_completed"),
+    )
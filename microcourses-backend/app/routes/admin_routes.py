@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
 from sqlalchemy.orm import Session
-from app.database.dependency import get_db
+from app.database.dependency import get_db, get_read_db
+from app.database.routing import replicas
 from app.models.course_model import Course
 from app.models.user_model import User
-from app.models.enrollment import Enrollment
-from app.utils.auth_jwt import get_current_user
+from app.utils.auth_jwt import get_current_user, invalidate_principal, principal_cache
+from app.utils.pagination import PageParams, paginate
+from app.controllers import course_controller
+from app.controllers.course_controller import COURSE_COLUMNS, serialize_course_row
+from app.controllers import analytics_controller, stats_controller, export_controller
+from app.controllers.progress_buffer import progress_buffer
+from app.utils.hashing import hash_stats
+from app.utils.catalog_cache import catalog_cache
+from app.utils import profiling
+from app.utils.record_stream import csv_chunks, gzip_chunks, ndjson_chunks
+from app.utils.serialization import json_response, row_serializer
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+USER_COLUMNS = (User.id, User.email, User.role)
+serialize_user_row = row_serializer(USER_COLUMNS)
+
 # 🔒 Only Admins Allowed
 def admin_only(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
@@ -17,32 +33,37 @@ def admin_only(current_user: User = Depends(get_current_user)):
 
 # ✅ Get all pending courses (is_approved = False)
 @router.get("/review/courses")
-def review_courses(db: Session = Depends(get_db), current_user: User = Depends(admin_only)):
-    pending_courses = db.query(Course).filter(Course.is_approved == False).all()
-    return pending_courses
+def review_courses(
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(admin_only),
+):
+    pending_courses = db.query(*COURSE_COLUMNS).filter(Course.is_approved == False)
+    return json_response(paginate(pending_courses, Course.id, page, response, serialize_course_row), response)
 
 
 # ✅ Approve a course
 @router.put("/approve/{course_id}")
 def approve_course(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(admin_only)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+    # Controller also invalidates the cached public catalog
+    course = course_controller.approve_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    course.is_approved = True
-    db.commit()
-    db.refresh(course)
     return {"message": f"✅ Course '{course.title}' approved successfully!"}
 
 
 # ✅ Get list of all users
 @router.get("/users")
-def list_users(db: Session = Depends(get_db), current_user: User = Depends(admin_only)):
-    users = db.query(User).all()
-    return [
-        {"id": user.id, "email": user.email, "role": user.role}
-        for user in users
-    ]
+def list_users(
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(admin_only),
+):
+    users = db.query(*USER_COLUMNS)
+    return json_response(paginate(users, User.id, page, response, serialize_user_row), response)
 
 
 # ✅ Update user role
@@ -64,20 +85,138 @@ def update_user_role(
     user.role = new_role
     db.commit()
     db.refresh(user)
+    # Role changes must apply immediately, not after the principal cache TTL
+    invalidate_principal(user.email)
     return {"message": f"✅ Updated role to '{new_role}'", "user": {"id": user.id, "email": user.email, "role": user.role}}
 
 
-# ✅ Dashboard Overview Stats
+# ✅ Dashboard Overview Stats (served from a background-refreshed snapshot)
 @router.get("/stats")
-def get_admin_stats(db: Session = Depends(get_db), current_user: User = Depends(admin_only)):
-    total_users = db.query(User).count()
-    total_courses = db.query(Course).count()
-    approved_courses = db.query(Course).filter(Course.is_approved == True).count()
-    total_enrollments = db.query(Enrollment).count()
+def get_admin_stats(
+    include: Optional[str] = Query(None, description="Pass 'roles' for per-role user counts"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(admin_only),
+):
+    stats, age = stats_controller.admin_stats.get(db)
+
+    result = {
+        "total_users": stats["total_users"],
+        "total_courses": stats["total_courses"],
+        "approved_courses": stats["approved_courses"],
+        "total_enrollments": stats["total_enrollments"],
+        "snapshot_age_seconds": round(age, 1),
+    }
+    if include == "roles":
+        result["users_by_role"] = stats["users_by_role"]
+    return result
+
+
+# ✅ Principal cache hit/miss counters
+@router.get("/cache/principals")
+def principal_cache_stats(current_user: User = Depends(admin_only)):
+    return principal_cache.stats()
+
+
+# ✅ Public catalog cache hit/miss counters
+@router.get("/cache/catalog")
+def catalog_cache_stats(current_user: User = Depends(admin_only)):
+    return catalog_cache.stats()
+
+
+# ✅ Course analytics cache hit/miss counters
+@router.get("/cache/analytics")
+def analytics_cache_stats(current_user: User = Depends(admin_only)):
+    return analytics_controller.analytics_cache.stats()
+
+
+# ✅ Progress write-behind buffer: pending, coalesced and flushed completions
+@router.get("/progress-buffer/stats")
+def progress_buffer_stats(current_user: User = Depends(admin_only)):
+    return progress_buffer.stats()
+
 
+# ✅ Read replica health and how many sessions each one served
+@router.get("/database/replicas")
+def replica_stats(current_user: User = Depends(admin_only)):
+    return replicas.stats()
+
+
+# ✅ Password hashing pool latency / queue-wait metrics
+@router.get("/hashing/stats")
+def hashing_stats(current_user: User = Depends(admin_only)):
+    return hash_stats.snapshot()
+
+
+def _export_response(db: Session, name: str, stmt, columns, format: str, gzip: bool):
+    chunks = (csv_chunks if format == "csv" else ndjson_chunks)(columns, export_controller.stream_rows(db, stmt))
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    filename = f"{name}.{format}"
+    if gzip:
+        chunks, media_type, filename = gzip_chunks(chunks), "application/gzip", f"{filename}.gz"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ✅ Export enrollments with student and course details (streamed CSV / NDJSON, optionally gzipped)
+@router.get("/export/enrollments")
+def export_enrollments(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    gzip: bool = Query(False),
+    course_id: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(admin_only),
+):
+    stmt = export_controller.enrollments_query(course_id)
+    return _export_response(db, "enrollments", stmt, export_controller.ENROLLMENT_COLUMNS, format, gzip)
+
+
+# ✅ Export lesson progress with student, course and lesson details
+@router.get("/export/progress")
+def export_progress(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    gzip: bool = Query(False),
+    course_id: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(admin_only),
+):
+    stmt = export_controller.progress_query(course_id)
+    return _export_response(db, "progress", stmt, export_controller.PROGRESS_COLUMNS, format, gzip)
+
+
+class SampleRateUpdate(BaseModel):
+    route: str = Field(..., min_length=1, description='Route template, optionally with a method: "GET /courses/search"')
+    percent: float = Field(..., ge=0, le=100)
+
+
+# ✅ Captured request profiles, newest first
+@router.get("/profiles")
+def list_profiles(current_user: User = Depends(admin_only)):
     return {
-        "total_users": total_users,
-        "total_courses": total_courses,
-        "approved_courses": approved_courses,
-        "total_enrollments": total_enrollments,
+        "enabled": profiling.PROFILING_ENABLED,
+        "sample_rates": profiling.sample_rates,
+        "profiles": profiling.profile_store.list(),
     }
+
+
+# ✅ Sample a percentage of requests to one route (0 stops sampling it)
+@router.put("/profiles/sample-rates")
+def set_profile_sample_rate(payload: SampleRateUpdate, current_user: User = Depends(admin_only)):
+    if not profiling.PROFILING_ENABLED:
+        raise HTTPException(status_code=409, detail="Profiling is disabled; set PROFILING_ENABLED=true")
+    if payload.percent:
+        profiling.sample_rates[payload.route] = payload.percent
+    else:
+        profiling.sample_rates.pop(payload.route, None)
+    return profiling.sample_rates
+
+
+# ✅ Download one profile as collapsed stacks (flamegraph.pl / speedscope)
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, current_user: User = Depends(admin_only)):
+    path = profiling.profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=f"{profile_id}.collapsed")
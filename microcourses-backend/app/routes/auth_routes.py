@@ -1,17 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database.dependency import get_db
-from app.utils.hashing import verify_password
+from app.database.dependency import get_async_db
+from app.utils.hashing import verify_and_update_async, HashingBusy
 from app.utils.auth_jwt import create_access_token
 from app.controllers import user_controller
 
 router = APIRouter(prefix="/login", tags=["Authentication"])
 
 @router.post("/", status_code=status.HTTP_200_OK)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db=Depends(get_async_db)
 ):
     """
     🔐 User Login API
@@ -20,7 +19,7 @@ def login(
     """
 
     # Get user by email
-    user = user_controller.get_user_by_email(db, form_data.username)
+    user = await db.run_sync(user_controller.get_user_by_email, form_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,26 +27,40 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Verify password (compare plain text with hashed)
-    if not verify_password(form_data.password, user.password_hash):
+    user_info = {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "role": user.role,
+    }
+
+    # Verify password (compare plain text with hashed) in the hashing pool
+    try:
+        valid, new_hash = await verify_and_update_async(form_data.password, user.password_hash)
+    except HashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Re-hash with the current cost settings when they have changed
+    if new_hash:
+        await db.run_sync(user_controller.update_password_hash, user_info["id"], new_hash)
+
     # Generate JWT token with user info
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role}
+        data={"sub": user_info["email"], "role": user_info["role"]}
     )
 
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "role": user.role,
-        }
+        "user": user_info,
     }
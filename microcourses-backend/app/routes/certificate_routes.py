@@ -1,22 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from fastapi.responses import FileResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
 import os
 
-from app.database.dependency import get_db
+from app.database.dependency import get_read_db
 from app.models.user_model import User
 from app.models.course_model import Course
-from app.models.progress_model import Progress
-from app.models.lesson_model import Lesson
 from app.utils.auth_jwt import get_current_user
+from app.controllers import completion_controller
+from app.utils.certificate_pdf import render_certificate_offloaded
+from app.utils.certificate_cache import certificate_cache, certificate_key
 
 router = APIRouter(prefix="/students", tags=["Certificate"])
 
 @router.get("/certificate/{course_id}")
-def generate_certificate(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def generate_certificate(
+    course_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
     """
     ✅ Generate and return a course completion certificate as a downloadable PDF.
     """
@@ -29,56 +33,49 @@ def generate_certificate(course_id: int, db: Session = Depends(get_db), current_
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    # Check if the student has completed all lessons
-    lessons = db.query(Lesson).filter(Lesson.course_id == course_id).all()
-    total_lessons = len(lessons)
-    completed = (
-        db.query(Progress)
-        .filter(
-            Progress.student_id == current_user.id,
-            Progress.course_id == course_id,
-            Progress.is_completed == True
-        )
-        .count()
-    )
-
-    if total_lessons == 0 or completed < total_lessons:
+    # Check if the student has completed all lessons (bitmap popcount vs cached total)
+    total_lessons, bits = completion_controller.get_completion(db, current_user.id, course_id)
+    if not completion_controller.is_course_complete(total_lessons, bits):
         raise HTTPException(status_code=400, detail="Course not fully completed yet")
+    completed = completion_controller.popcount(bits)
 
-    # 📜 Create certificate directory if not exists
-    cert_dir = "certificates"
-    os.makedirs(cert_dir, exist_ok=True)
-    file_path = os.path.join(cert_dir, f"certificate_{current_user.id}_{course_id}.pdf")
-
-    # 🖋️ Generate the PDF
-    c = canvas.Canvas(file_path, pagesize=letter)
-    width, height = letter
-
-    c.setFont("Helvetica-Bold", 28)
-    c.drawCentredString(width / 2, height - 150, "Certificate of Completion")
-
-    c.setFont("Helvetica", 18)
-    c.drawCentredString(width / 2, height - 220, f"This is to certify that")
-    c.setFont("Helvetica-Bold", 22)
-    c.drawCentredString(width / 2, height - 260, f"{current_user.email}")
-
-    c.setFont("Helvetica", 18)
-    c.drawCentredString(width / 2, height - 300, f"has successfully completed the course:")
-    c.setFont("Helvetica-Bold", 22)
-    c.drawCentredString(width / 2, height - 340, f"{course.title}")
+    # 📜 Serve from the content-addressed cache when this exact certificate exists
+    key = certificate_key(current_user.id, course_id, current_user.email, course.title, completed, total_lessons)
+    etag = f'"{key}"'
+    file_path = certificate_cache.get(key)
+    if file_path is None:
+        # 🖋️ Render from the precompiled template in the worker pool
+        pdf_bytes = render_certificate_offloaded(current_user.email, course.title)
+        file_path = certificate_cache.put(key, pdf_bytes)
 
-    c.setFont("Helvetica", 14)
-    c.drawCentredString(width / 2, height - 400, f"Completion Date: {datetime.now().strftime('%d %B %Y')}")
-
-    c.setFont("Helvetica-Oblique", 12)
-    c.drawCentredString(width / 2, 100, "🎓 MicroCourses Platform")
-
-    c.showPage()
-    c.save()
+    last_modified = os.path.getmtime(file_path)
+    cache_headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=cache_headers)
 
     # ✅ Return file as downloadable response
     return FileResponse(
         file_path,
         media_type="application/pdf",
-        filename=f"Certificate_{course.title}.pdf"
+        filename=f"Certificate_{course.title}.pdf",
+        headers=cache_headers,
     )
+
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
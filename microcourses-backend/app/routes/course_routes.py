@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database.dependency import get_db
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Optional
+from app.database.dependency import get_async_read_db
+from app.database.routing import use_primary
 from app.models.course_model import Course
+from app.controllers.course_controller import COURSE_COLUMNS, serialize_course_row
+from app.controllers import search_controller
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, PageParams,
+    decode_cursor, encode_cursor, paginate_async,
+)
+from app.utils.catalog_cache import APPROVED_COURSES, catalog_cache
+from app.utils.serialization import json_response
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
@@ -9,8 +18,40 @@ router = APIRouter(prefix="/courses", tags=["Courses"])
 
 # ✅ ADD THIS NEW ROUTE:
 @router.get("/approved")
-def get_approved_courses(db: Session = Depends(get_db)):
+async def get_approved_courses(request: Request, response: Response, page: PageParams = Depends(), db=Depends(get_async_read_db)):
     """
-    Fetch all admin-approved courses for students to view.
+    Fetch admin-approved courses for students to view (keyset paginated).
+    Pages are served pre-serialized from the catalog cache with an ETag.
     """
-    return db.query(Course).filter(Course.is_approved == True).all()
+    def compute(scratch: Response):
+        use_primary(db)  # the page is cached for every reader
+        return paginate_async(
+            db,
+            lambda session: session.query(*COURSE_COLUMNS).filter(Course.is_approved == True),
+            Course.id,
+            page,
+            scratch,
+            serialize_course_row,
+        )
+
+    if page.stream:
+        return await compute(response)
+    return await catalog_cache.respond(request, APPROVED_COURSES, page, compute)
+
+
+# ✅ Full-text search over approved courses and their lessons (ranked, paginated)
+@router.get("/search")
+async def search_courses(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1),
+    db=Depends(get_async_read_db),
+):
+    # Results are ordered by rank, so the cursor carries an offset rather than a key
+    offset = decode_cursor(cursor, "offset") if cursor else 0
+    limit = min(limit, MAX_PAGE_SIZE)
+    items, has_more = await db.run_sync(search_controller.search_courses, q, offset, limit)
+    if has_more:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(offset + limit, "offset")
+    return json_response(items, response)
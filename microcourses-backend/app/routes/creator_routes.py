@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.utils.role_checker import role_required
-from app.database.dependency import get_db
+from app.database.dependency import get_async_db, get_db, get_read_db
 from app.utils.auth_jwt import get_current_user
 from app.models.course_model import Course
 from app.models.user_model import User
 from app.schemas.course_schema import CourseCreate, CourseOut
-from app.controllers import course_controller
+from app.controllers import analytics_controller, course_controller, certificate_controller
+from app.controllers.import_controller import IMPORT_MAX_ROWS, CourseImport
+from app.utils.record_stream import RecordError, iter_csv, iter_ndjson
+from app.utils.zip_stream import stream_zip
+from app.utils.serialization import json_response
 
 router = APIRouter(prefix="/creator", tags=["Creator"])
 
+IMPORT_PARSERS = {
+    "application/x-ndjson": iter_ndjson,
+    "application/ndjson": iter_ndjson,
+    "application/jsonl": iter_ndjson,
+    "text/csv": iter_csv,
+    "application/csv": iter_csv,
+}
+
 
 @router.post("/apply", dependencies=[Depends(role_required("creator"))])
 def apply_for_course():
@@ -36,29 +49,115 @@ def create_course(
         "id": course.id,
         "title": course.title,
         "description": course.description,
+        "creator_id": course.creator_id,
+        "is_approved": course.is_approved,
         "status": "Approved" if course.is_approved else "Pending"
     }
 
 
+# ✅ Bulk import courses and lessons from an NDJSON or CSV body, parsed as it streams in
+@router.post("/courses/import")
+async def import_courses(
+    request: Request,
+    atomic: bool = Query(False, description="Roll back the whole import if any row fails"),
+    db=Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != "creator":
+        raise HTTPException(status_code=403, detail="Only creators can import courses")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parser = IMPORT_PARSERS.get(content_type)
+    if parser is None:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or text/csv")
+
+    job = CourseImport(current_user.id)
+    try:
+        async for line, record in parser(request.stream()):
+            if isinstance(record, RecordError):
+                job.error(line, str(record))
+                continue
+            if job.rows >= IMPORT_MAX_ROWS:
+                raise HTTPException(status_code=413, detail=f"Imports are limited to {IMPORT_MAX_ROWS} rows")
+            job.add(line, record)
+            if job.batch_full:
+                await db.run_sync(job.flush)
+    except RecordError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return await db.run_sync(job.finish, atomic)
+
+
 @router.get("/my-courses")
 def my_courses(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     if current_user.role != "creator":
         raise HTTPException(status_code=403, detail="Only creators can view their courses")
 
-    courses = db.query(Course).filter(Course.creator_id == current_user.id).all()
+    courses = (
+        db.query(Course.id, Course.title, Course.description, Course.is_approved)
+        .filter(Course.creator_id == current_user.id)
+        .all()
+    )
 
     formatted_courses = [
         {
-            "id": course.id,
-            "title": course.title,
-            "description": course.description,
+            "id": course_id,
+            "title": title,
+            "description": description,
             # 👇 Return a proper string status field
-            "status": "Approved" if course.is_approved else "Pending"
+            "status": "Approved" if is_approved else "Pending"
         }
-        for course in courses
+        for course_id, title, description, is_approved in courses
     ]
 
-    return formatted_courses
+    return json_response(formatted_courses)
+
+
+# ✅ Bulk certificates for every student who completed a course (streamed ZIP)
+@router.get("/courses/{course_id}/certificates")
+def cohort_certificates(
+    course_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role not in ("creator", "admin"):
+        raise HTTPException(status_code=403, detail="Only creators and admins can issue certificates")
+
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if current_user.role == "creator" and course.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You can only issue certificates for your own courses")
+
+    total_lessons = certificate_controller.count_lessons(db, course_id)
+    if total_lessons == 0:
+        raise HTTPException(status_code=400, detail="Course has no lessons")
+
+    entries = certificate_controller.iter_cohort_certificates(db, course, total_lessons)
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="certificates_course_{course_id}.zip"'},
+    )
+
+
+# ✅ Completion funnel: per-lesson completions, lessons-completed distribution, completion rate
+@router.get("/courses/{course_id}/analytics")
+def course_analytics(
+    course_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role not in ("creator", "admin"):
+        raise HTTPException(status_code=403, detail="Only creators and admins can view course analytics")
+
+    course = db.query(Course.id, Course.title, Course.creator_id).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if current_user.role == "creator" and course.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You can only view analytics for your own courses")
+
+    return json_response({"title": course.title, **analytics_controller.get_course_analytics(db, course_id)})
@@ -1,12 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from app.database.dependency import get_db
+from starlette.concurrency import run_in_threadpool
+from app.database.dependency import get_db, get_async_read_db
+from app.database.routing import use_primary
 from app.utils.auth_jwt import get_current_user
-from app.schemas.lesson_schema import LessonCreate, LessonOut
+from app.schemas.lesson_schema import LessonCreate, LessonOut, LessonOutlineOut
 from app.controllers import lesson_controller
+from app.models.lesson_model import Lesson
+from app.utils.pagination import PageParams, paginate_async
+from app.utils.catalog_cache import catalog_cache, lessons_scope
+from app.utils.content_delivery import PreparedBody, PreparedBodyCache, deliver, prepare
+from app.utils.serialization import dumps
 
 router = APIRouter(prefix="/lessons", tags=["Lessons"])
 
+# Hashed and compressed lesson bodies, dropped with their course's lessons_scope
+lesson_bodies = PreparedBodyCache(
+    max_bytes=int(os.getenv("LESSON_BODY_CACHE_BYTES", str(64 * 1024 * 1024))),
+    generation=catalog_cache.generation,
+)
+
+
+def _prepare_lesson(lesson, variant: str) -> PreparedBody:
+    if variant == "content":
+        return prepare(lesson.content.encode(), "text/plain; charset=utf-8")
+    return prepare(dumps(lesson_controller.serialize_lesson_row(lesson)), "application/json")
+
+
+async def _lesson_body(db, lesson_id: int, variant: str) -> PreparedBody:
+    prepared = lesson_bodies.get((lesson_id, variant))
+    if prepared is None:
+        use_primary(db)  # the body is cached for every reader
+        lesson = await db.run_sync(lesson_controller.get_lesson_row, lesson_id)
+        if lesson is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        scope = lessons_scope(lesson.course_id)
+        generation = catalog_cache.generation(scope)
+        # Hashing and compressing a large body would stall the event loop
+        prepared = await run_in_threadpool(_prepare_lesson, lesson, variant)
+        lesson_bodies.set((lesson_id, variant), scope, generation, prepared)
+    return prepared
+
 @router.post("/", response_model=LessonOut)
 def create_lesson(lesson_in: LessonCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     if current_user.role != "creator":
@@ -14,5 +49,50 @@ def create_lesson(lesson_in: LessonCreate, db: Session = Depends(get_db), curren
     return lesson_controller.create_lesson(db, lesson_in.title, lesson_in.content, lesson_in.course_id)
 
 @router.get("/course/{course_id}", response_model=list[LessonOut])
-def get_lessons(course_id: int, db: Session = Depends(get_db)):
-    return lesson_controller.get_lessons_by_course(db, course_id)
+async def get_lessons(course_id: int, request: Request, response: Response, page: PageParams = Depends(), db=Depends(get_async_read_db)):
+    def compute(scratch: Response):
+        use_primary(db)  # the page is cached for every reader
+        return paginate_async(
+            db,
+            lambda session: lesson_controller.query_lessons_by_course(session, course_id),
+            Lesson.id,
+            page,
+            scratch,
+            lesson_controller.serialize_lesson_row,
+        )
+
+    if page.stream:
+        return await compute(response)
+    # ✅ Pre-serialized page + ETag from the catalog cache
+    return await catalog_cache.respond(request, lessons_scope(course_id), page, compute)
+
+
+# ✅ Course outline for dashboards: id + title only, lesson content is never loaded
+@router.get("/course/{course_id}/outline", response_model=list[LessonOutlineOut])
+async def get_lesson_outline(course_id: int, request: Request, response: Response, page: PageParams = Depends(), db=Depends(get_async_read_db)):
+    def compute(scratch: Response):
+        use_primary(db)  # the page is cached for every reader
+        return paginate_async(
+            db,
+            lambda session: lesson_controller.query_lesson_outline(session, course_id),
+            Lesson.id,
+            page,
+            scratch,
+            lesson_controller.serialize_lesson_outline_row,
+        )
+
+    if page.stream:
+        return await compute(response)
+    return await catalog_cache.respond(request, lessons_scope(course_id), page, compute, variant="outline")
+
+
+# ✅ Single lesson (gzip/br negotiated)
+@router.get("/{lesson_id}", response_model=LessonOut)
+async def get_lesson(lesson_id: int, request: Request, db=Depends(get_async_read_db)):
+    return deliver(request, await _lesson_body(db, lesson_id, "json"))
+
+
+# ✅ Raw lesson content with compression and HTTP Range support for large bodies
+@router.get("/{lesson_id}/content")
+async def get_lesson_content(lesson_id: int, request: Request, db=Depends(get_async_read_db)):
+    return deliver(request, await _lesson_body(db, lesson_id, "content"))
@@ -1,28 +1,51 @@
 # app/routes/progress_routes.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database.dependency import get_db
+from app.database.dependency import get_async_db, get_async_read_db
 from app.utils.auth_jwt import get_current_user
-from app.schemas.progress_schema import ProgressCreate, ProgressOut, CourseProgressOut
+from app.schemas.progress_schema import (
+    ProgressCreate,
+    ProgressOut,
+    CourseProgressOut,
+    ProgressBatchCreate,
+    ProgressBatchOut,
+)
 from app.controllers import progress_controller
+from app.utils.serialization import typed_response
 
 router = APIRouter(prefix="/students/progress", tags=["Progress"])
 
 @router.post("/complete", response_model=ProgressOut, status_code=status.HTTP_200_OK)
-def complete_lesson(payload: ProgressCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def complete_lesson(payload: ProgressCreate, db=Depends(get_async_db), current_user = Depends(get_current_user)):
     # only student role allowed (adjust if you also want creators/admin update)
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can mark lessons completed")
 
-    prog = progress_controller.mark_lesson_complete(
-        db, student_id=current_user.id, course_id=payload.course_id, lesson_id=payload.lesson_id
+    result = await db.run_sync(
+        progress_controller.mark_lesson_complete, current_user.id, payload.course_id, payload.lesson_id
     )
-    return prog
+    if result["not_found"]:
+        raise HTTPException(status_code=404, detail="Lesson not found in this course")
+    if result["not_enrolled"]:
+        raise HTTPException(status_code=403, detail="You are not enrolled in this course")
+    return typed_response(ProgressOut, result["completed"][0])
+
+@router.post("/complete-batch", response_model=ProgressBatchOut, status_code=status.HTTP_200_OK)
+async def complete_lessons_batch(payload: ProgressBatchCreate, db=Depends(get_async_db), current_user = Depends(get_current_user)):
+    """
+    Record many lesson completions in one request (e.g. an offline session sync).
+    Lessons that don't exist or belong to courses the student isn't enrolled in
+    are reported back instead of failing the whole batch.
+    """
+    if current_user.role != "student":
+        raise HTTPException(status_code=403, detail="Only students can mark lessons completed")
+
+    result = await db.run_sync(progress_controller.complete_lessons, current_user.id, payload.lesson_ids)
+    return typed_response(ProgressBatchOut, result)
 
 @router.get("/{course_id}", response_model=CourseProgressOut)
-def get_course_progress(course_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def get_course_progress(course_id: int, db=Depends(get_async_read_db), current_user = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can view their progress")
 
-    result = progress_controller.get_progress_for_course(db, student_id=current_user.id, course_id=course_id)
-    return result
+    result = await db.run_sync(progress_controller.get_progress_for_course, current_user.id, course_id)
+    return typed_response(CourseProgressOut, result)
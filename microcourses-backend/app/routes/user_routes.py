@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from app.schemas.user_schema import UserCreate, UserOut
 from app.controllers import user_controller
-from app.database.dependency import get_db
+from app.database.dependency import get_async_db
+from app.utils.hashing import hash_password_async, HashingBusy
 from app.utils.auth_jwt import get_current_user
 from app.models.user_model import User
+from app.utils.serialization import typed_response
 
 router = APIRouter(
     prefix="/users",
@@ -13,20 +14,29 @@ router = APIRouter(
 
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_in: UserCreate, db=Depends(get_async_db)):
     """
     Register a new user (Creator, Admin, or Customer).
     Only unique emails are allowed.
     """
-    existing_user = user_controller.get_user_by_email(db, user_in.email)
+    existing_user = await db.run_sync(user_controller.get_user_by_email, user_in.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    created_user = user_controller.create_user(db, user_in)
-    return created_user
+    try:
+        hashed = await hash_password_async(user_in.password)
+    except HashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many registrations in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    created_user = await db.run_sync(user_controller.create_user, user_in, hashed)
+    return typed_response(UserOut, created_user, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/me", response_model=UserOut)
@@ -34,9 +44,9 @@ def get_current_user_profile(current_user: User = Depends(get_current_user)):
     """
     Fetch current logged-in user's profile using JWT token.
     """
-    return {
+    return typed_response(UserOut, {
         "id": current_user.id,
         "email": current_user.email,
         "role": current_user.role,
         "name": current_user.name
-    }
+    })
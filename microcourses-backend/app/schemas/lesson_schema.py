@@ -13,3 +13,11 @@ class LessonOut(LessonBase):
 
     class Config:
         from_attributes = True
+
+class LessonOutlineOut(BaseModel):
+    id: int
+    title: str
+    course_id: int
+
+    class Config:
+        from_attributes = True
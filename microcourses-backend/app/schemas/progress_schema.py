@@ -1,5 +1,5 @@
 # app/schemas/progress_schema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class ProgressCreate(BaseModel):
     course_id: int
@@ -13,9 +13,20 @@ class ProgressOut(BaseModel):
     is_completed: bool
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class CourseProgressOut(BaseModel):
     course_id: int
     completed_lessons: list[int]
     total_lessons: int
+
+class ProgressBatchCreate(BaseModel):
+    lesson_ids: list[int] = Field(..., min_length=1, max_length=500)
+
+class ProgressBatchOut(BaseModel):
+    completed: list[ProgressOut]
+    newly_completed: list[int]
+    queued: list[int] = []  # accepted by the write-behind buffer, not written yet
+    already_completed: list[int]
+    not_found: list[int]
+    not_enrolled: list[int]
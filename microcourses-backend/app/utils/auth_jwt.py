@@ -1,11 +1,13 @@
+import os
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database.connection import get_db
+from app.database.dependency import get_async_db
 
 from app.models.user_model import User
+from app.utils.cache import TTLCache
 
 # Secret key & algorithm
 SECRET_KEY = "microcourses_secret_key_2025"
@@ -14,6 +16,31 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Decoded principals keyed by token subject (email), so most requests skip the user lookup
+principal_cache = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user, safe to share across requests."""
+    id: int
+    email: str
+    name: str | None
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User):
+        return cls(id=user.id, email=user.email, name=user.name, role=user.role, is_active=user.is_active)
+
+
+def invalidate_principal(email: str):
+    """Drop a cached principal so changes to the user apply on the next request."""
+    principal_cache.invalidate(email)
+
 
 # Create JWT token
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -24,8 +51,12 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
+def _get_user_by_email(db, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
 # Verify and get current user
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -40,10 +71,48 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    principal = principal_cache.get(email)
+    if principal is None:
+        user = await db.run_sync(_get_user_by_email, email)
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.set(email, principal)
+    # Deactivated accounts lose access at once, like in principal_from_authorization
+    if not principal.is_active:
         raise credentials_exception
-    return user
+    return principal
+
+
+async def principal_from_authorization(authorization: str | None):
+    """
+    Principal for a raw Authorization header, or None when it is missing or
+    invalid. For code outside dependency injection, such as middleware.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        email = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+    if email is None:
+        return None
+
+    principal = principal_cache.get(email)
+    if principal is None:
+        from starlette.concurrency import run_in_threadpool
+        from app.database.connection import SessionLocal
+
+        def load():
+            with SessionLocal() as db:
+                user = _get_user_by_email(db, email)
+                return Principal.from_user(user) if user else None
+
+        principal = await run_in_threadpool(load)
+        if principal is not None:
+            principal_cache.set(email, principal)
+    return principal if principal is not None and principal.is_active else None
 
 
 # Role-based check
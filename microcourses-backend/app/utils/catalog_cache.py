@@ -0,0 +1,103 @@
+import os
+import hashlib
+import threading
+from typing import Awaitable, Callable, NamedTuple
+from fastapi import Request, Response
+from app.utils.cache import TTLCache
+from app.utils.pagination import NEXT_CURSOR_HEADER, PageParams
+from app.utils.serialization import dumps
+
+# Scope of the public approved-course list; lesson lists are scoped per course
+APPROVED_COURSES = "courses:approved"
+
+
+def lessons_scope(course_id: int) -> str:
+    return f"lessons:{course_id}"
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: str
+    next_cursor: str | None
+
+
+class CatalogCache:
+    """
+    Pre-serialized public catalog pages with strong ETags.
+
+    Every scope has a generation number that is part of each key; invalidating
+    a scope bumps it, so stale pages become unreachable and age out of the LRU.
+    A page computed while an invalidation lands is stored under the old
+    generation and never served. The TTL bounds staleness across workers,
+    since invalidation is per process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.pages = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, scope: str) -> int:
+        with self._lock:
+            return self._generations.get(scope, 0)
+
+    def invalidate(self, scope: str):
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._generations.clear()
+        self.pages.clear()
+
+    def stats(self):
+        return self.pages.stats()
+
+    async def respond(
+        self,
+        request: Request,
+        scope: str,
+        page: PageParams,
+        compute: Callable[[Response], Awaitable[list]],
+        variant: str = "",
+    ) -> Response:
+        """
+        Serve one page of `scope` from the cache, or build it with `compute`,
+        which receives a scratch response for the pagination headers. Pages
+        are shared by every reader, so `compute` should read on the primary
+        (`use_primary`): a page from a lagging replica would outlive the
+        invalidation that was meant to replace it.
+        `variant` separates different views of the same scope (e.g. outline).
+        """
+        generation = self.generation(scope)
+        key = (scope, variant, generation, page.after, page.limit)
+        cached = self.pages.get(key)
+        if cached is None:
+            scratch = Response()
+            items = await compute(scratch)
+            body = dumps(items)
+            cached = CachedPage(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', scratch.headers.get(NEXT_CURSOR_HEADER))
+            self.pages.set(key, cached)
+
+        headers = {"ETag": cached.etag, "Cache-Control": "public, no-cache"}
+        if cached.next_cursor:
+            headers[NEXT_CURSOR_HEADER] = cached.next_cursor
+        if _etag_matches(request, cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+catalog_cache = CatalogCache(
+    maxsize=int(os.getenv("CATALOG_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("CATALOG_CACHE_TTL", "300")),
+)
@@ -0,0 +1,100 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from app.utils.certificate_pdf import TEMPLATE_VERSION
+
+CERT_CACHE_DIR = os.getenv("CERT_CACHE_DIR", "certificates")
+CERT_CACHE_MAX_BYTES = int(os.getenv("CERT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def certificate_key(user_id: int, course_id: int, student_name: str, course_title: str,
+                    completed_lessons: int, total_lessons: int) -> str:
+    """
+    Content address of a certificate: everything that changes the rendered
+    PDF (who, what, completion state, template version) feeds the hash.
+    """
+    material = "|".join(map(str, [
+        user_id, course_id, student_name, course_title,
+        completed_lessons, total_lessons, TEMPLATE_VERSION,
+    ]))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class CertificateCache:
+    """
+    On-disk certificate store with LRU eviction capped by total bytes.
+    Recency lives only in the in-memory index, which is rebuilt from the
+    directory (oldest file first) on first use. A file's mtime is when it was
+    written and never changes afterwards, so it doubles as Last-Modified.
+    """
+
+    def __init__(self, directory: str = CERT_CACHE_DIR, max_bytes: int = CERT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._index = None  # key -> size, least recently used first
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _load_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".pdf") and len(entry.name) == 68:
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name[:-4], st.st_size))
+        self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self.total_bytes = sum(self._index.values())
+
+    def get(self, key: str):
+        """Return the cached file path, or None on a miss."""
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            if key not in self._index:
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):
+                self.total_bytes -= self._index.pop(key)
+                return None
+            self._index.move_to_end(key)
+            return path
+
+    def put(self, key: str, data: bytes) -> str:
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self.total_bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict()
+            return path
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._index or ()),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+certificate_cache = CertificateCache()
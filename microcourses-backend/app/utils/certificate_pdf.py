@@ -0,0 +1,179 @@
+"""
+Certificate PDF rendering.
+
+`render_certificate` is the fast path: the page objects, fonts and static
+layout are serialized once into a template, and each call only writes the
+text runs for the student, course and date plus the cross-reference table.
+`render_certificate_canvas` is the original reportlab canvas implementation,
+kept as a reference for benchmarks.
+
+reportlab is only imported when the first certificate is rendered, so it
+stays off the app's import path.
+"""
+import os
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+# Bump when the layout changes so cached certificates are regenerated
+TEMPLATE_VERSION = 1
+
+# reportlab.lib.pagesizes.letter, in points
+PAGE_WIDTH, PAGE_HEIGHT = 612.0, 792.0
+
+# Standard Type1 fonts referenced by the content stream
+_FONTS = {
+    "F1": "Helvetica",
+    "F2": "Helvetica-Bold",
+    "F3": "Helvetica-Oblique",
+}
+
+
+def _escape(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _centred_text(font_key: str, size: int, y: float, text: str) -> bytes:
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    x = (PAGE_WIDTH - stringWidth(text, _FONTS[font_key], size)) / 2
+    return b"BT /%s %d Tf %.2f %.2f Td (%s) Tj ET\n" % (font_key.encode(), size, x, y, _escape(text))
+
+
+@lru_cache(maxsize=1)
+def _template():
+    """Build (prefix, xref, static layout) once per process, on first render."""
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    font_refs = " ".join(f"/{key} {n} 0 R" for n, key in enumerate(_FONTS, start=4))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH:g} {PAGE_HEIGHT:g}] "
+            f"/Resources << /Font << {font_refs} >> >> /Contents 7 0 R >>"
+        ).encode(),
+    ] + [
+        f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>".encode()
+        for name in _FONTS.values()
+    ]
+
+    body = io.BytesIO()
+    body.write(header)
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(body.tell())
+        body.write(b"%d 0 obj\n%s\nendobj\n" % (number, obj))
+    prefix = body.getvalue()
+
+    # Every object except the content stream sits at a fixed offset
+    xref = b"xref\n0 8\n0000000000 65535 f \n" + b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    xref += b"%010d 00000 n \n" % len(prefix)
+
+    static_layout = b"".join([
+        _centred_text("F2", 28, PAGE_HEIGHT - 150, "Certificate of Completion"),
+        _centred_text("F1", 18, PAGE_HEIGHT - 220, "This is to certify that"),
+        _centred_text("F1", 18, PAGE_HEIGHT - 300, "has successfully completed the course:"),
+        _centred_text("F3", 12, 100, "MicroCourses Platform"),
+    ])
+    return prefix, xref, static_layout
+
+
+
+def render_certificate(student_name: str, course_title: str, completed_on: datetime | None = None) -> bytes:
+    """Render a certificate by overlaying the per-student text on the precompiled template."""
+    prefix, xref, static_layout = _template()
+    completed_on = completed_on or datetime.now()
+    content = static_layout + b"".join([
+        _centred_text("F2", 22, PAGE_HEIGHT - 260, student_name),
+        _centred_text("F2", 22, PAGE_HEIGHT - 340, course_title),
+        _centred_text("F1", 14, PAGE_HEIGHT - 400, f"Completion Date: {completed_on.strftime('%d %B %Y')}"),
+    ])
+    stream = b"7 0 obj\n<< /Length %d >>\nstream\n%s\nendstream\nendobj\n" % (len(content), content)
+    startxref = len(prefix) + len(stream)
+    return b"".join([
+        prefix,
+        stream,
+        xref,
+        b"trailer\n<< /Size 8 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % startxref,
+    ])
+
+
+def render_certificate_canvas(student_name: str, course_title: str, completed_on: datetime | None = None) -> bytes:
+    """Reference implementation: draw the whole page with reportlab on every call."""
+    from reportlab.pdfgen import canvas
+
+    completed_on = completed_on or datetime.now()
+    buffer = io.BytesIO()
+    width, height = PAGE_WIDTH, PAGE_HEIGHT
+    c = canvas.Canvas(buffer, pagesize=(width, height))
+
+    c.setFont("Helvetica-Bold", 28)
+    c.drawCentredString(width / 2, height - 150, "Certificate of Completion")
+
+    c.setFont("Helvetica", 18)
+    c.drawCentredString(width / 2, height - 220, "This is to certify that")
+    c.setFont("Helvetica-Bold", 22)
+    c.drawCentredString(width / 2, height - 260, student_name)
+
+    c.setFont("Helvetica", 18)
+    c.drawCentredString(width / 2, height - 300, "has successfully completed the course:")
+    c.setFont("Helvetica-Bold", 22)
+    c.drawCentredString(width / 2, height - 340, course_title)
+
+    c.setFont("Helvetica", 14)
+    c.drawCentredString(width / 2, height - 400, f"Completion Date: {completed_on.strftime('%d %B %Y')}")
+
+    c.setFont("Helvetica-Oblique", 12)
+    c.drawCentredString(width / 2, 100, "🎓 MicroCourses Platform")
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+# Rendering runs off the request path in a small process pool.
+# CERT_RENDER_WORKERS=0 renders inline instead (useful for tests and tiny hosts).
+CERT_RENDER_WORKERS = int(os.getenv("CERT_RENDER_WORKERS", "2"))
+CERT_RENDER_TIMEOUT = float(os.getenv("CERT_RENDER_TIMEOUT", "30"))
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=CERT_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def render_certificate_offloaded(student_name: str, course_title: str, completed_on: datetime | None = None) -> bytes:
+    """Render in the worker pool and wait for the PDF bytes."""
+    if CERT_RENDER_WORKERS <= 0:
+        return render_certificate(student_name, course_title, completed_on)
+    future = _get_pool().submit(render_certificate, student_name, course_title, completed_on)
+    return future.result(timeout=CERT_RENDER_TIMEOUT)
+
+
+def _render_args(args):
+    return render_certificate(*args)
+
+
+def render_many_offloaded(batch: list[tuple]) -> list[bytes]:
+    """Render a batch of (student_name, course_title, completed_on) across the worker pool."""
+    if CERT_RENDER_WORKERS <= 0:
+        return [render_certificate(*args) for args in batch]
+    chunksize = max(1, len(batch) // (CERT_RENDER_WORKERS * 4))
+    return list(_get_pool().map(_render_args, batch, chunksize=chunksize, timeout=CERT_RENDER_TIMEOUT))
+
+
+def shutdown_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,211 @@
+"""
+Delivery of large text bodies: Accept-Encoding negotiation (br, gzip) and
+single byte-range requests.
+
+`prepare` hashes and compresses a body once (CPU-bound, so call it off the
+event loop); `deliver` only picks the representation a request asks for.
+PreparedBodyCache keeps prepared bodies across requests.
+
+Ranges are served from the identity encoding, so offsets always refer to
+the stored content. brotli is optional; without it only gzip is offered.
+"""
+import os
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+from fastapi import Request, Response
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "512"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Parse Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def _codings() -> list[str]:
+    return ["br", "gzip"] if _brotli() is not None else ["gzip"]
+
+
+def choose_encoding(request: Request, size: int) -> str | None:
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    candidates = _codings()
+    best = None
+    for coding in candidates:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (coding, q)
+    return best[0] if best else None
+
+
+def _encode(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class PreparedBody(NamedTuple):
+    body: bytes
+    media_type: str
+    digest: str
+    encodings: dict  # coding -> encoded body, for bodies worth compressing
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(encoded) for encoded in self.encodings.values())
+
+
+def prepare(body: bytes, media_type: str) -> PreparedBody:
+    """Hash `body` and encode it in every offered coding."""
+    encodings = {}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encodings = {coding: _encode(body, coding) for coding in _codings()}
+    return PreparedBody(body, media_type, hashlib.sha256(body).hexdigest()[:32], encodings)
+
+
+class PreparedBodyCache:
+    """
+    LRU of prepared bodies, bounded by their total size. Every entry records
+    the scope and generation it was built under (see CatalogCache); once the
+    scope is invalidated the entry is a miss.
+    """
+
+    def __init__(self, max_bytes: int, generation: Callable[[str], int]):
+        self.max_bytes = max_bytes
+        self._generation = generation
+        self._entries = OrderedDict()  # key -> (scope, generation, PreparedBody)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> PreparedBody | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._generation(entry[0]) == entry[1]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, scope: str, generation: int, prepared: PreparedBody):
+        if prepared.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (scope, generation, prepared)
+            self._bytes += prepared.size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[2].size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _parse_range(header: str, size: int):
+    """
+    Return (start, end) inclusive for a single `bytes=` range, None when the
+    header should be ignored (serve the whole body) and "unsatisfiable" for 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                return "unsatisfiable"
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+def deliver(request: Request, prepared: PreparedBody) -> Response:
+    """Serve a prepared body with a strong ETag, compression or a 206 partial response."""
+    body, media_type, digest = prepared.body, prepared.media_type, prepared.digest
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "public, no-cache",
+    }
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == f'"{digest}"'):
+        selected = _parse_range(range_header, len(body))
+        if selected == "unsatisfiable":
+            headers["Content-Range"] = f"bytes */{len(body)}"
+            return Response(status_code=416, headers=headers)
+        if selected is not None:
+            start, end = selected
+            headers["ETag"] = f'"{digest}"'
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            return Response(content=body[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+    coding = choose_encoding(request, len(body))
+    # Each encoding is a different representation, so it gets its own strong tag
+    etag = f'"{digest}-{coding}"' if coding else f'"{digest}"'
+    headers["ETag"] = etag
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    if coding:
+        headers["Content-Encoding"] = coding
+        body = prepared.encodings[coding]
+    return Response(content=body, media_type=media_type, headers=headers)
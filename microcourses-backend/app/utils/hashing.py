@@ -1,10 +1,134 @@
-from passlib.context import CryptContext
+import os
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# PBKDF2 cost; hashes made with a different round count are upgraded on next login
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
 
 # use PBKDF2 instead of bcrypt – 100 % compatible and secure
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# (passlib and its backends load on first use, not when the app starts)
+@lru_cache(maxsize=1)
+def pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__rounds=PASSWORD_HASH_ROUNDS,
+    )
 
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password, hashed_password):
+    """Returns (is_valid, new_hash); new_hash is set when the stored hash uses outdated settings."""
+    return pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+# ---------------------------------------------------------------------------
+# Offloaded hashing: PBKDF2 runs in a dedicated process pool so login bursts
+# can't starve the request threadpool. HASH_WORKERS=0 falls back to threads.
+# ---------------------------------------------------------------------------
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(max(HASH_WORKERS, 1) * 8)))
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+def _timed(fn, *args):
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class _HashStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+    def snapshot(self):
+        with self.lock:
+            completed = self.completed or 1
+            return {
+                "workers": HASH_WORKERS,
+                "max_pending": HASH_MAX_PENDING,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_seconds_avg": self.hash_seconds_total / completed,
+                "hash_seconds_max": self.hash_seconds_max,
+                "queue_wait_seconds_avg": self.queue_wait_seconds_total / completed,
+                "queue_wait_seconds_max": self.queue_wait_seconds_max,
+            }
+
+
+hash_stats = _HashStats()
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def _offload(fn, *args):
+    with hash_stats.lock:
+        if hash_stats.pending >= HASH_MAX_PENDING:
+            hash_stats.rejected += 1
+            raise HashingBusy()
+        hash_stats.pending += 1
+
+    submitted = time.time()
+    try:
+        if HASH_WORKERS > 0:
+            result, started, finished = await asyncio.wrap_future(_get_pool().submit(_timed, fn, *args))
+        else:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(None, _timed, fn, *args)
+    finally:
+        with hash_stats.lock:
+            hash_stats.pending -= 1
+
+    with hash_stats.lock:
+        hash_stats.completed += 1
+        hash_stats.hash_seconds_total += finished - started
+        hash_stats.hash_seconds_max = max(hash_stats.hash_seconds_max, finished - started)
+        wait = max(started - submitted, 0.0)
+        hash_stats.queue_wait_seconds_total += wait
+        hash_stats.queue_wait_seconds_max = max(hash_stats.queue_wait_seconds_max, wait)
+    return result
+
+
+async def hash_password_async(password: str):
+    return await _offload(hash_password, password)
+
+
+async def verify_and_update_async(plain_password, hashed_password):
+    return await _offload(verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_hash_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,204 @@
+"""
+Request and database instrumentation exposed in the Prometheus text format.
+
+MetricsMiddleware times every request (until the last body chunk is sent, so
+streamed responses count in full) and tracks requests in flight. SQLAlchemy
+cursor events add each statement's count and duration to the request that
+issued it, found through a contextvar that Starlette's threadpool and the
+async session's greenlets inherit. Requests over SLOW_REQUEST_MS or
+SLOW_REQUEST_QUERIES are logged.
+"""
+import os
+import time
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# 0 turns a threshold off
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "20"))
+
+# [statements, seconds in the database] for the request being served. A caller that
+# sets its own list around an in-process request (benchmarks.load) gets the
+# request's totals added to it.
+_request_db = contextvars.ContextVar("request_db", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = _labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{{{base},le=\"{bound}\"}} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            yield f"{self.name}_bucket{{{base},le=\"+Inf\"}} {cumulative}"
+            yield f"{self.name}_sum{{{base}}} {series[-1]}"
+            yield f"{self.name}_count{{{base}}} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            yield f"{self.name}{{{_labels(self.label_names, labels)}}} {value}"
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount: int):
+        with self._lock:
+            self.value += amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.value}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+REQUESTS = Counter("http_requests_total", "Requests served.", ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "Request latency, to the last body byte.",
+                    ("method", "route"), LATENCY_BUCKETS)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served.")
+DB_QUERIES = Histogram("http_request_db_queries", "SQL statements issued per request.",
+                       ("method", "route"), QUERY_BUCKETS)
+DB_SECONDS = Histogram("http_request_db_seconds", "Time spent executing SQL per request.",
+                       ("method", "route"), LATENCY_BUCKETS)
+
+METRICS = (REQUESTS, LATENCY, IN_FLIGHT, DB_QUERIES, DB_SECONDS)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _request_db.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        _after_cursor_execute(conn, None, None, None, None, False)
+
+
+def install_sql_hooks(engine):
+    """Attribute statements run on `engine` (sync, or an AsyncEngine's sync_engine) to the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so it sees the end of streamed bodies and keeps the request's context."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        caller_stats = _request_db.get()
+        db_stats = [0, 0.0]
+        token = _request_db.set(db_stats)
+        status = 500
+        started = time.perf_counter()
+        IN_FLIGHT.add(1)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.add(-1)
+            _request_db.reset(token)
+            if caller_stats is not None:
+                caller_stats[0] += db_stats[0]
+                caller_stats[1] += db_stats[1]
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            labels = (scope["method"], route)
+            REQUESTS.inc(labels + (str(status),))
+            LATENCY.observe(labels, elapsed)
+            DB_QUERIES.observe(labels, db_stats[0])
+            DB_SECONDS.observe(labels, db_stats[1])
+            if (SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS) or (
+                SLOW_REQUEST_QUERIES and db_stats[0] >= SLOW_REQUEST_QUERIES
+            ):
+                logger.warning(
+                    "Slow request %s %s -> %s: %.1f ms, %d queries, %.1f ms in database",
+                    scope["method"], scope["path"], status, elapsed * 1000, db_stats[0], db_stats[1] * 1000,
+                )
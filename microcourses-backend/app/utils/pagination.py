@@ -0,0 +1,119 @@
+import os
+import json
+import base64
+import binascii
+from typing import Callable, Optional
+from fastapi import HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from app.database.routing import ReadSessionLocal
+from app.utils.serialization import dumps
+
+# Server-side limits for list endpoints (override via environment)
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int, field: str = "id") -> str:
+    """Turn the last seen key into an opaque, URL-safe cursor."""
+    raw = json.dumps({field: last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, field: str = "id") -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))[field]
+        if not isinstance(last_id, int) or last_id < 0:
+            raise ValueError
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class PageParams:
+    """
+    Query parameters shared by every paginated list endpoint.
+    Usage:
+        def list_things(page: PageParams = Depends(), ...)
+
+    Requests with neither `cursor` nor `limit` come from clients that don't
+    page; they get every row (`limit` is None), as before pagination existed.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+        limit: Optional[int] = Query(None, ge=1, description="Page size; without cursor or limit every row is returned"),
+        stream: bool = Query(False, description="Stream every remaining row as one JSON array"),
+    ):
+        self.after = decode_cursor(cursor) if cursor else None
+        if self.after is None and limit is None:
+            self.limit = None
+        else:
+            # Never trust the client with the page size
+            self.limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        self.stream = stream
+
+
+def _stream_json(rows, serialize: Callable):
+    yield b"["
+    first = True
+    for row in rows:
+        if not first:
+            yield b","
+        first = False
+        yield dumps(serialize(row))
+    yield b"]"
+
+
+def paginate(query, key_column, page: PageParams, response: Response, serialize: Callable):
+    """
+    Apply keyset pagination on `key_column` (ascending) to a SQLAlchemy query.
+
+    Paged mode returns a list of serialized rows and sets X-Next-Cursor when
+    more rows exist (unbounded pages return every row). Stream mode returns every row after the cursor as a
+    StreamingResponse fed from a `yield_per` cursor, so memory stays flat.
+    """
+    if page.after is not None:
+        query = query.filter(key_column > page.after)
+    query = query.order_by(key_column)
+
+    if page.stream:
+        return StreamingResponse(
+            _stream_json(query.yield_per(STREAM_BATCH_SIZE), serialize),
+            media_type="application/json",
+        )
+
+    if page.limit is None:
+        return [serialize(row) for row in query]
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], key_column.key))
+    return [serialize(row) for row in rows]
+
+
+async def paginate_async(db, build_query: Callable, key_column, page: PageParams, response: Response, serialize: Callable):
+    """
+    `paginate` for async routes. `build_query(session)` returns the query to page.
+
+    Paged mode runs through `db.run_sync`. Stream mode reads on its own sync
+    session inside the response generator, which Starlette iterates in the
+    threadpool, so the event loop never blocks on the cursor.
+    """
+    if page.stream:
+        def rows():
+            with ReadSessionLocal() as session:
+                query = build_query(session)
+                if page.after is not None:
+                    query = query.filter(key_column > page.after)
+                yield from query.order_by(key_column).yield_per(STREAM_BATCH_SIZE)
+
+        return StreamingResponse(_stream_json(rows(), serialize), media_type="application/json")
+
+    return await db.run_sync(lambda session: paginate(build_query(session), key_column, page, response, serialize))
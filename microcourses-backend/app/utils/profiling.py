@@ -0,0 +1,307 @@
+"""
+On-demand sampling profiler for live requests.
+
+Enabled with PROFILING_ENABLED=true. A request is profiled when an admin
+sends `X-Profile: 1` (or `?profile=1`), or when its route has a sample rate
+(PROFILE_SAMPLE_RATES="GET /courses/search=5,/lessons/{lesson_id}=1", or set
+at runtime through the admin API).
+
+One sampler thread snapshots every thread's stack each PROFILE_INTERVAL_MS and
+keeps the stacks that belong to a profiled request: those running under its
+middleware frame (its async code on the event loop), under `anchored` controller
+calls (threadpool and greenlet work started through run_sync), or inside its
+endpoint when that is a sync function. Results are written as collapsed stacks
+(flamegraph.pl / speedscope input) with a JSON sidecar to a ring buffer of the
+newest PROFILE_KEEP profiles in PROFILE_DIR.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import secrets
+import inspect
+import threading
+import contextvars
+from collections import Counter
+from functools import lru_cache, wraps
+from urllib.parse import parse_qs
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "4"))
+PROFILE_HEADER = "X-Profile-Id"
+
+_MAX_DEPTH = 128
+_PROFILE_ID = re.compile(r"^\d{8}T\d{9}-[0-9a-f]{8}$")
+
+_active_profile = contextvars.ContextVar("active_profile", default=None)
+
+
+def _parse_rates(spec: str) -> dict:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, percent = item.rpartition("=")
+        rates[route.strip()] = float(percent)
+    return rates
+
+
+# "METHOD /route/template" or "/route/template" -> percent of requests to profile
+sample_rates = _parse_rates(os.getenv("PROFILE_SAMPLE_RATES", ""))
+
+
+class Profile:
+    def __init__(self, scope, reason: str):
+        now = time.time()
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}{int(now % 1 * 1000):03d}-{secrets.token_hex(4)}"
+        self.scope = scope
+        self.reason = reason
+        self.anchors = set()  # frames whose callees belong to this request
+        self.endpoint_code = None
+        self.stacks = Counter()
+        self.samples = 0
+
+
+def anchored(fn):
+    """
+    Wrap a controller call so the profile active in this context (if any)
+    claims the stacks it runs, in whichever thread or greenlet executes it.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        frame = sys._getframe()
+        profile.anchors.add(frame)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.anchors.discard(frame)
+
+    return run
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for marker in ("site-packages" + os.sep, "microcourses-backend" + os.sep):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class Sampler:
+    """Single background thread sampling on behalf of every active profile."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.profiles = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+
+    def add(self, profile: Profile) -> bool:
+        with self._lock:
+            if len(self.profiles) >= PROFILE_MAX_CONCURRENT:
+                return False
+            self.profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+            return True
+
+    def remove(self, profile: Profile) -> tuple[Counter, int]:
+        """Stop sampling `profile`; returns a copy of its (stacks, samples) that no tick can still change."""
+        with self._lock:
+            self.profiles.discard(profile)
+            return Counter(profile.stacks), profile.samples
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self.profiles:
+                    self._wake.wait()
+            frames = sys._current_frames()
+            # Attribute under the lock, so a tick never counts into a removed profile
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id != own_id:
+                        self._attribute(frame, self.profiles)
+            del frames
+            time.sleep(self.interval)
+
+    def _attribute(self, frame, profiles):
+        stack = []
+        while frame is not None and len(stack) < _MAX_DEPTH:
+            stack.append(frame)
+            frame = frame.f_back
+        for profile in profiles:
+            if profile.endpoint_code is None:
+                route = profile.scope.get("route")
+                endpoint = getattr(route, "endpoint", None)
+                # Sync endpoints run in the threadpool, outside any anchor
+                if endpoint is not None and not inspect.iscoroutinefunction(endpoint):
+                    profile.endpoint_code = getattr(endpoint, "__code__", False)
+            for depth, candidate in enumerate(stack):
+                if candidate in profile.anchors or candidate.f_code is profile.endpoint_code:
+                    # Root-to-leaf, starting at the request's own frame
+                    labels = [_frame_label(f.f_code) for f in reversed(stack[: depth + 1])]
+                    profile.stacks[";".join(labels)] += 1
+                    profile.samples += 1
+                    break
+
+
+class ProfileStore:
+    """Ring buffer of the newest `keep` profiles on disk."""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def path(self, profile_id: str) -> str | None:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.collapsed")
+        return path if os.path.exists(path) else None
+
+    def save(self, profile_id: str, stacks: Counter, meta: dict):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, profile_id)
+            with open(f"{base}.collapsed", "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(f"{base}.json", "w") as f:
+                json.dump(meta, f)
+            self._evict()
+
+    def _evict(self):
+        # Ids start with a UTC timestamp, so name order is age order
+        names = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+        for profile_id in names[: max(0, len(names) - self.keep)]:
+            for suffix in (".collapsed", ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return profiles
+
+
+sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+profile_store = ProfileStore(PROFILE_DIR, PROFILE_KEEP)
+
+
+@lru_cache(maxsize=256)
+def _template_pattern(template: str):
+    """Regex for a route template: "/lessons/{lesson_id}" matches "/lessons/7"."""
+    parts = re.split(r"(\{[^}]+\})", template)
+    return re.compile("^" + "".join(
+        (".+" if part.endswith(":path}") else "[^/]+") if part.startswith("{") else re.escape(part)
+        for part in parts
+    ) + "$")
+
+
+def _sampled(scope) -> bool:
+    for key, percent in list(sample_rates.items()):
+        method, _, template = key.rpartition(" ")
+        if method and method.upper() != scope["method"]:
+            continue
+        if _template_pattern(template).match(scope["path"]):
+            return random.random() * 100 < percent
+    return False
+
+
+def _header(scope, name: bytes):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _requested(scope) -> bool:
+    flag = _header(scope, b"x-profile")
+    if flag is not None:
+        return flag in ("1", "true")
+    return parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile") in (["1"], ["true"])
+
+
+class ProfilingMiddleware:
+    """Profiles admin-requested and sampled requests; everything else passes straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        reason = None
+        if _requested(scope):
+            from app.utils.auth_jwt import principal_from_authorization
+
+            principal = await principal_from_authorization(_header(scope, b"authorization"))
+            # The flag is silently ignored for everyone but admins
+            if principal is not None and principal.role == "admin":
+                reason = "requested"
+        if reason is None and _sampled(scope):
+            reason = "sampled"
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        profile = Profile(scope, reason)
+        if not sampler.add(profile):
+            return await self.app(scope, receive, send)
+        profile.anchors.add(sys._getframe())
+        token = _active_profile.set(profile)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (PROFILE_HEADER.lower().encode(), profile.id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            stacks, samples = sampler.remove(profile)
+            _active_profile.reset(token)
+            from starlette.concurrency import run_in_threadpool
+
+            await run_in_threadpool(profile_store.save, profile.id, stacks, {
+                "id": profile.id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "reason": reason,
+                "duration_ms": round(elapsed * 1000, 2),
+                "samples": samples,
+                "interval_ms": PROFILE_INTERVAL_MS,
+                "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+
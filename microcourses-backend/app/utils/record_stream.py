@@ -0,0 +1,108 @@
+import io
+import csv
+import json
+import zlib
+import codecs
+
+MAX_RECORD_BYTES = 1024 * 1024
+
+
+class RecordError(ValueError):
+    """A record that could not be parsed; the stream continues with the next one."""
+
+
+async def _lines(chunks, max_bytes: int):
+    """Decode a byte stream and yield (line number, line) without ever holding more than one line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            line_no += 1
+            yield line_no, line.removesuffix("\r")
+        if len(pending) > max_bytes:
+            raise RecordError(f"Line {line_no + 1} is longer than {max_bytes} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending.removesuffix("\r")
+
+
+async def iter_ndjson(chunks, max_bytes: int = MAX_RECORD_BYTES):
+    """Yield (line number, dict or RecordError) for each non-blank line of an NDJSON stream."""
+    async for line_no, line in _lines(chunks, max_bytes):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, RecordError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, RecordError("Each line must be a JSON object")
+            continue
+        yield line_no, record
+
+
+async def iter_csv(chunks, max_bytes: int = MAX_RECORD_BYTES):
+    """
+    Yield (line number, dict or RecordError) per CSV record, keyed by the
+    header row. Quoted fields may span lines: a record is complete once its
+    quotes balance. Empty cells come through as None.
+    """
+    header = None
+    record, start = "", None
+    async for line_no, line in _lines(chunks, max_bytes):
+        record = f"{record}\n{line}" if start is not None else line
+        start = start if start is not None else line_no
+        if record.count('"') % 2:
+            if len(record) > max_bytes:
+                raise RecordError(f"Record starting on line {start} is longer than {max_bytes} bytes")
+            continue
+        text, record_start, record, start = record, start, "", None
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) > len(header):
+            yield record_start, RecordError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield record_start, {name: (value if value != "" else None) for name, value in zip(header, values)}
+    if start is not None:
+        yield start, RecordError("Unterminated quoted field")
+
+
+def csv_chunks(columns, batches):
+    """Encode batches of row tuples as CSV, one chunk per batch, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(columns, batches):
+    """Encode batches of row tuples as NDJSON objects keyed by `columns`, one chunk per batch."""
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+            for row in rows
+        ).encode()
+
+
+def gzip_chunks(chunks, level: int = 6):
+    """Gzip a byte stream incrementally (a single gzip member)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,76 @@
+"""
+Fast JSON encoding for responses.
+
+Whatever a route returns that isn't a Response goes through FastAPI's
+`jsonable_encoder` (a recursive walk in Python) and then `json.dumps`. Hot
+routes skip both:
+
+- `json_response` for payloads that are already plain dicts/lists (list
+  endpoints build them from row tuples, see `row_serializer`), encoded by orjson;
+- `typed_response` for payloads with a response model, validated and dumped
+  to JSON bytes in one go by a TypeAdapter built once per type.
+
+Bytes match what JSONResponse would produce (compact, UTF-8, no ASCII
+escaping). Without orjson installed, `dumps` falls back to the json module.
+"""
+import json
+from functools import lru_cache
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+
+def row_serializer(columns):
+    """
+    Row -> dict for a query over `columns`, keyed by the column names. Keys
+    are taken once here; Row._asdict rebuilds them for every row.
+    """
+    keys = tuple(column.key for column in columns)
+    return lambda row: dict(zip(keys, row))
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _carried_headers(response: Response | None) -> dict | None:
+    # Headers a route set on its injected `response` (cursors etc.) are dropped
+    # by FastAPI once a Response is returned, so copy them over
+    if response is None:
+        return None
+    return {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+
+
+def json_response(content, response: Response | None = None, status_code: int = 200) -> Response:
+    """Encode plain data without jsonable_encoder. Responses (e.g. streamed pages) pass through."""
+    if isinstance(content, Response):
+        return content
+    return FastJSONResponse(content, status_code=status_code, headers=_carried_headers(response))
+
+
+@lru_cache(maxsize=None)
+def adapter(tp) -> TypeAdapter:
+    """One compiled TypeAdapter per response type."""
+    return TypeAdapter(tp)
+
+
+def typed_response(tp, value, response: Response | None = None, status_code: int = 200) -> Response:
+    """
+    Validate `value` (dicts or ORM objects) as `tp` and encode it in pydantic's
+    Rust core, where FastAPI would validate, dump to Python, then json.dumps.
+    """
+    type_adapter = adapter(tp)
+    body = type_adapter.dump_json(type_adapter.validate_python(value, from_attributes=True))
+    return Response(body, status_code=status_code, media_type="application/json", headers=_carried_headers(response))
@@ -0,0 +1,34 @@
+import zipfile
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable sink; zipfile then emits data descriptors instead of seeking back."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries):
+    """
+    Build a ZIP archive incrementally from an iterable of (filename, bytes)
+    and yield it chunk by chunk, so only one entry is held in memory at a time.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield buffer.drain()
+    # Central directory is written on close
+    yield buffer.drain()
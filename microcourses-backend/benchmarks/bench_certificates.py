@@ -0,0 +1,41 @@
+"""
+Certificates per second: precompiled template vs. full reportlab canvas.
+
+Run from microcourses-backend/:
+    python -m benchmarks.bench_certificates --count 2000
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from app.utils.certificate_pdf import render_certificate, render_certificate_canvas
+
+
+def _rate(render, count):
+    when = datetime(2025, 1, 1)
+    start = time.perf_counter()
+    for i in range(count):
+        render(f"student{i}@example.com", f"Course {i % 50}", when)
+    elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    canvas_rate = _rate(render_certificate_canvas, args.count)
+    template_rate = _rate(render_certificate, args.count)
+    print(json.dumps({
+        "benchmark": "certificates",
+        "count": args.count,
+        "canvas_per_sec": round(canvas_rate, 1),
+        "template_per_sec": round(template_rate, 1),
+        "speedup": round(template_rate / canvas_rate, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Course search: full-text index vs. a naive ILIKE scan.
+
+Seeds a synthetic catalog (100k lessons by default), then times each query
+through search_controller.search_courses and through an ILIKE filter over
+course and lesson text, reporting medians per query as JSON.
+
+Run from microcourses-backend/:
+    python -m benchmarks.bench_search --lessons 100000 --repeat 5
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_search   # empty scratch database
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "search.db")
+
+from sqlalchemy import or_, select  # noqa: E402
+
+from app.database.connection import SessionLocal, engine  # noqa: E402
+from app.database.migrate import migrate  # noqa: E402
+from app.models.course_model import Course  # noqa: E402
+from app.models.lesson_model import Lesson  # noqa: E402
+from app.controllers import search_controller  # noqa: E402
+from benchmarks.seed import SeedSpec, seed  # noqa: E402
+
+QUERIES = ["python", "cryptography", "guitar piano", "stat", "zebra"]
+
+
+def naive_search(db, q: str, limit: int = 20):
+    """What a search looks like without an index: substring matches on every text column."""
+    conditions = []
+    for term in q.split():
+        pattern = f"%{term}%"
+        in_lessons = select(Lesson.course_id).where(or_(Lesson.title.ilike(pattern), Lesson.content.ilike(pattern)))
+        conditions.append(or_(Course.title.ilike(pattern), Course.description.ilike(pattern), Course.id.in_(in_lessons)))
+    return (
+        db.query(Course)
+        .filter(Course.is_approved == True, *conditions)
+        .order_by(Course.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=5_000)
+    parser.add_argument("--lessons", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    migrate(engine)
+    started = time.perf_counter()
+    seed(engine, SeedSpec(users=1_000, courses=args.courses, lessons=args.lessons, progress=0))
+    seed_seconds = time.perf_counter() - started
+
+    results = []
+    with SessionLocal() as db:
+        for q in QUERIES:
+            fts_ms, (items, _) = _median_ms(lambda: search_controller.search_courses(db, q, 0, args.limit), args.repeat)
+            naive_ms, rows = _median_ms(lambda: naive_search(db, q, args.limit), args.repeat)
+            results.append({
+                "query": q,
+                "fts_ms": round(fts_ms, 2),
+                "ilike_ms": round(naive_ms, 2),
+                "speedup": round(naive_ms / fts_ms, 1) if fts_ms else None,
+                "fts_hits": len(items),
+                "ilike_hits": len(rows),
+            })
+
+    print(json.dumps({
+        "dialect": engine.dialect.name,
+        "courses": args.courses,
+        "lessons": args.lessons,
+        "seed_seconds": round(seed_seconds, 1),
+        "queries": results,
+        "median_speedup": statistics.median(r["speedup"] for r in results if r["speedup"]),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
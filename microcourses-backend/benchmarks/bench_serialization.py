@@ -0,0 +1,152 @@
+"""
+Response serialization: FastAPI's generic path vs. app.utils.serialization.
+
+For each payload, times producing the response body for --rows rows (1,000
+by default) the way routes used to (ORM objects, hand-built dicts or pydantic
+dumps, then jsonable_encoder / json.dumps) and the way they do now (column
+projections, row dicts, orjson or a compiled TypeAdapter). "serialize_ms"
+starts from rows already in memory; "end_to_end_ms" includes the query and
+ORM hydration. Medians are reported as JSON.
+
+Run from microcourses-backend/:
+    python -m benchmarks.bench_serialization --rows 1000 --repeat 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "serialization.db")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.database.connection import SessionLocal, engine  # noqa: E402
+from app.database.migrate import migrate  # noqa: E402
+from app.models.course_model import Course  # noqa: E402
+from app.models.lesson_model import Lesson  # noqa: E402
+from app.models.user_model import User  # noqa: E402
+from app.controllers.course_controller import COURSE_COLUMNS, serialize_course, serialize_course_row  # noqa: E402
+from app.controllers.lesson_controller import query_lessons_by_course, serialize_lesson, serialize_lesson_row  # noqa: E402
+from app.routes.admin_routes import USER_COLUMNS, serialize_user_row  # noqa: E402
+from app.schemas.progress_schema import ProgressBatchOut  # noqa: E402
+from app.utils.serialization import adapter, dumps, orjson  # noqa: E402
+from benchmarks.seed import SeedSpec, seed  # noqa: E402
+
+
+def json_response_body(content) -> bytes:
+    """What JSONResponse renders after jsonable_encoder."""
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _compare(name, rows, before_fetch, before_encode, after_fetch, after_encode, repeat):
+    with SessionLocal() as db:
+        old_rows, new_rows = before_fetch(db), after_fetch(db)
+        assert json.loads(before_encode(old_rows)) == json.loads(after_encode(new_rows)), name
+        result = {
+            "payload": name,
+            "rows": len(new_rows) if isinstance(new_rows, list) else rows,
+            "before_serialize_ms": _median_ms(lambda: before_encode(old_rows), repeat),
+            "after_serialize_ms": _median_ms(lambda: after_encode(new_rows), repeat),
+            "before_end_to_end_ms": _median_ms(lambda: before_encode(before_fetch(db)), repeat),
+            "after_end_to_end_ms": _median_ms(lambda: after_encode(after_fetch(db)), repeat),
+        }
+    per_1000 = 1000 / max(result["rows"], 1)
+    for key in [k for k in result if k.endswith("_ms")]:
+        result[key] = round(result[key] * per_1000, 3)
+    result["serialize_speedup"] = round(result["before_serialize_ms"] / result["after_serialize_ms"], 1)
+    result["end_to_end_speedup"] = round(result["before_end_to_end_ms"] / result["after_end_to_end_ms"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    n = args.rows
+
+    migrate(engine)
+    seed(engine, SeedSpec(users=n, courses=n, lessons=n, progress=0))
+    with SessionLocal() as db:
+        # Put every seeded lesson in one course, like a long lesson list
+        course_id = db.query(Lesson.course_id).limit(1).scalar()
+        db.query(Lesson).update({Lesson.course_id: course_id})
+        db.commit()
+
+    batch = {
+        "completed": [
+            {"id": i, "student_id": 1, "course_id": 1, "lesson_id": i, "is_completed": True} for i in range(n)
+        ],
+        "newly_completed": list(range(n)),
+        "already_completed": [],
+        "not_found": [],
+        "not_enrolled": [],
+    }
+    model = TypeAdapter(ProgressBatchOut)
+    typed = adapter(ProgressBatchOut)
+
+    results = [
+        _compare(
+            "courses (review/approved lists)", n,
+            lambda db: [serialize_course(c) for c in db.query(Course).order_by(Course.id).limit(n)],
+            json_response_body,
+            lambda db: db.query(*COURSE_COLUMNS).order_by(Course.id).limit(n).all(),
+            lambda rows: dumps([serialize_course_row(r) for r in rows]),
+            args.repeat,
+        ),
+        _compare(
+            "lessons with content", n,
+            lambda db: [serialize_lesson(l) for l in db.query(Lesson).filter(Lesson.course_id == course_id).order_by(Lesson.id)],
+            json_response_body,
+            lambda db: query_lessons_by_course(db, course_id).order_by(Lesson.id).all(),
+            lambda rows: dumps([serialize_lesson_row(r) for r in rows]),
+            args.repeat,
+        ),
+        _compare(
+            "users (admin list)", n,
+            lambda db: [{"id": u.id, "email": u.email, "role": u.role} for u in db.query(User).order_by(User.id).limit(n)],
+            json_response_body,
+            lambda db: db.query(*USER_COLUMNS).order_by(User.id).limit(n).all(),
+            lambda rows: dumps([serialize_user_row(r) for r in rows]),
+            args.repeat,
+        ),
+        _compare(
+            "ProgressBatchOut (response_model)", n,
+            lambda db: batch,
+            # FastAPI: validate, dump to Python in JSON mode, then json.dumps
+            lambda value: json.dumps(
+                model.dump_python(model.validate_python(value), mode="json"), ensure_ascii=False, separators=(",", ":")
+            ).encode(),
+            lambda db: batch,
+            lambda value: typed.dump_json(typed.validate_python(value, from_attributes=True)),
+            args.repeat,
+        ),
+    ]
+
+    print(json.dumps({
+        "dialect": engine.dialect.name,
+        "orjson": getattr(orjson, "__version__", None),
+        "rows": n,
+        "repeat": args.repeat,
+        "unit": "ms per 1,000 rows",
+        "payloads": results,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Cold start: app import time and time-to-first-response, with a budget.
+
+Each run is a fresh interpreter, like a new instance on an autoscaled host.
+The run fails (exit 1) if the median goes over budget, or if a module that
+should load on first use (reportlab, passlib) is imported by `app.main`.
+
+Run from microcourses-backend/:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --import-budget-ms 1500 --first-response-budget-ms 3000
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+
+# Heavy modules that must stay off the import path
+DEFERRED_MODULES = ("reportlab", "passlib")
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2000"))
+FIRST_RESPONSE_BUDGET_MS = float(os.getenv("STARTUP_FIRST_RESPONSE_BUDGET_MS", "4000"))
+
+_IMPORT_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def _env():
+    env = dict(os.environ)
+    # A local file keeps the numbers about the app, not the network
+    env.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db"))
+    env.setdefault("STATS_REFRESH_SECONDS", "0")
+    return env
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env):
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE], env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure_first_response(env, timeout=30.0):
+    """Seconds from process launch until GET / answers 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn exited before answering")
+                time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--first-response-budget-ms", type=float, default=FIRST_RESPONSE_BUDGET_MS)
+    args = parser.parse_args()
+
+    env = _env()
+    # One untimed run so every timed run sees warm bytecode caches
+    measure_import(env)
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    first_responses = [measure_first_response(env) for _ in range(args.runs)]
+
+    import_ms = statistics.median(r["seconds"] for r in imports) * 1000
+    first_response_ms = statistics.median(first_responses) * 1000
+    eagerly_loaded = sorted({m for r in imports for m in r["loaded"]})
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import {import_ms:.0f} ms > budget {args.import_budget_ms:.0f} ms")
+    if first_response_ms > args.first_response_budget_ms:
+        failures.append(f"first response {first_response_ms:.0f} ms > budget {args.first_response_budget_ms:.0f} ms")
+    if eagerly_loaded:
+        failures.append(f"deferred modules imported at startup: {', '.join(eagerly_loaded)}")
+
+    print(json.dumps({
+        "runs": args.runs,
+        "import_ms_median": round(import_ms, 1),
+        "import_ms_max": round(max(r["seconds"] for r in imports) * 1000, 1),
+        "first_response_ms_median": round(first_response_ms, 1),
+        "first_response_ms_max": round(max(first_responses) * 1000, 1),
+        "budget": {"import_ms": args.import_budget_ms, "first_response_ms": args.first_response_budget_ms},
+        "failures": failures,
+    }, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Query plan check for the hot routes.
+
+Seeds a synthetic dataset, drives each hot route once (including a page
+past the first), captures every SELECT the request issued and asks the
+database for its plan. Any full table scan is reported and the script
+exits non-zero, so a missing index shows up before it reaches production.
+tests/test_query_plans.py runs the same check as part of the test suite.
+
+    python -m benchmarks.check_query_plans                        # throwaway SQLite file
+    DATABASE_URL=postgresql://... python -m benchmarks.check_query_plans   # empty scratch database
+
+Admin stats are left out on purpose: they count whole tables by design.
+"""
+import os
+import re
+import sys
+import json
+import tempfile
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "plans.db")
+# Statements are captured on the sync engine, so keep every route on it
+os.environ["DATABASE_ASYNC"] = "false"
+os.environ.setdefault("CERT_RENDER_WORKERS", "0")
+os.environ.setdefault("CERT_CACHE_DIR", tempfile.mkdtemp())
+os.environ.setdefault("STATS_REFRESH_SECONDS", "0")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.database.connection import engine  # noqa: E402
+from app.database.migrate import migrate  # noqa: E402
+from benchmarks.seed import SeedSpec, seed  # noqa: E402
+
+# A full pass over a table, or over every entry of one of its indexes
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$")
+
+
+def _capture(statements):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+    return before_cursor_execute
+
+
+def _full_scans(conn, statement, parameters, tables):
+    """Return the tables the plan reads in full."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        scans = []
+        for row in rows:
+            match = _SQLITE_SCAN.match(row[-1])
+            if match and match.group(1) in tables:
+                scans.append(match.group(1))
+        return scans
+
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in tables:
+            scans.append(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def check_plans() -> dict:
+    """Seed, drive the hot routes and return a report listing every full scan."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.database.connection import Base
+    from app.utils.auth_jwt import create_access_token
+    from app.utils.catalog_cache import catalog_cache
+
+    migrate(engine)
+    data = seed(engine, SeedSpec(users=3_000, courses=300, lessons=3_000, progress=20_000))
+    tables = set(Base.metadata.tables)
+
+    def auth(email):
+        return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+    student = data.student_emails[0]
+    student_id = int(student.removeprefix("student").split("@")[0])
+    enrolled = [c for s, c in data.enrollments if s == student_id]
+    course_id = enrolled[0]
+    lesson_id = data.lesson_ids_by_course[course_id][-1]
+    other_course = next(c for c in data.approved_course_ids if c not in enrolled)
+    creator = data.creator_emails[0]
+    admin = data.admin_email
+
+    client = TestClient(app)
+    first_catalog = client.get("/courses/approved?limit=20")
+    catalog_cursor = first_catalog.headers.get("X-Next-Cursor", "")
+    first_users = client.get("/admin/users?limit=20", headers=auth(admin))
+    users_cursor = first_users.headers.get("X-Next-Cursor", "")
+
+    routes = [
+        ("GET", "/courses/approved?limit=20", None, None),
+        ("GET", f"/courses/approved?limit=20&cursor={catalog_cursor}", None, None),
+        ("GET", f"/lessons/course/{course_id}?limit=5", None, None),
+        ("GET", f"/lessons/course/{course_id}/outline", None, None),
+        ("GET", f"/lessons/{lesson_id}/content", None, None),
+        ("GET", "/courses/search?q=python&limit=5", None, None),
+        ("GET", "/students/enrollments?include=progress&limit=2", student, None),
+        ("GET", "/students/enrollments?include=progress&after=1&limit=2", student, None),
+        ("GET", f"/students/progress/{course_id}", student, None),
+        ("POST", "/students/complete-lesson", student, {"lesson_id": lesson_id}),
+        # Completes the course so the certificate check below reaches the render path
+        ("POST", "/students/progress/complete-batch", student,
+         {"lesson_ids": list(data.lesson_ids_by_course[course_id])}),
+        ("POST", "/students/enroll", student, {"course_id": other_course}),
+        ("GET", f"/students/certificate/{course_id}", student, None),
+        ("GET", "/creator/my-courses", creator, None),
+        ("GET", f"/creator/courses/{course_id}/analytics", f"creator{data.creator_of[course_id]}@example.com", None),
+        ("GET", "/admin/review/courses?limit=20", admin, None),
+        ("GET", f"/admin/users?limit=20&cursor={users_cursor}", admin, None),
+    ]
+
+    violations = []
+    checked = 0
+    for method, path, email, body in routes:
+        # Cached catalog pages run no SQL; every route must reach the database here
+        catalog_cache.clear()
+        statements = []
+        listener = _capture(statements)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            response = client.request(method, path, json=body, headers=auth(email) if email else None)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        if response.status_code >= 500:
+            violations.append({"route": f"{method} {path}", "error": response.status_code})
+            continue
+
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                checked += 1
+                scans = _full_scans(conn, statement, parameters, tables)
+                if scans:
+                    violations.append({
+                        "route": f"{method} {path}",
+                        "full_scans": scans,
+                        "statement": " ".join(statement.split()),
+                    })
+
+    return {
+        "dialect": engine.dialect.name,
+        "routes": len(routes),
+        "statements_checked": checked,
+        "violations": violations,
+    }
+
+
+def main():
+    report = check_plans()
+    print(json.dumps(report, indent=2))
+    return 1 if report["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
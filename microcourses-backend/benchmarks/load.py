@@ -0,0 +1,333 @@
+"""
+In-process load test.
+
+Seeds a synthetic dataset (see benchmarks.seed), then drives every router
+through httpx's ASGI transport — no network, no server process — and reports
+per-endpoint p50/p95/p99 latency, throughput, error count and SQL statements
+per request as JSON, so runs can be diffed.
+
+Run from microcourses-backend/:
+    python -m benchmarks.load                                  # small dataset, throwaway SQLite
+    python -m benchmarks.load --scale large --output run.json  # 100k users / 10k courses / 200k lessons / 5M progress
+    DATABASE_URL=postgresql://... python -m benchmarks.load    # empty scratch database
+    python -m benchmarks.load --only courses.search,students.enrollments --requests 500 --concurrency 16
+    PROGRESS_WRITE_BEHIND=true python -m benchmarks.load --only students.complete_lesson
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "load.db")
+os.environ.setdefault("CERT_CACHE_DIR", tempfile.mkdtemp())
+os.environ.setdefault("STATS_REFRESH_SECONDS", "0")
+
+from benchmarks.seed import PASSWORD, SeedSpec, seed  # noqa: E402
+
+SCALES = {
+    "small": SeedSpec(users=2_000, courses=200, lessons=2_000, progress=10_000),
+    "medium": SeedSpec(users=20_000, courses=2_000, lessons=40_000, progress=500_000),
+    "large": SeedSpec(users=100_000, courses=10_000, lessons=200_000, progress=5_000_000),
+}
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    email: str | None = None
+    json: dict | None = None
+    data: dict | None = None
+    content: bytes | None = None
+    content_type: str | None = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable  # (data, rng, n) -> Request
+    weight_requests: float = 1.0  # fraction of --requests for expensive endpoints
+
+
+def _enrolled(data, rng):
+    """A random (student email, course id) pair the student is enrolled in."""
+    student_id, course_id = rng.choice(data.enrollments)
+    return f"student{student_id}@example.com", course_id
+
+
+def _creator(data, course_id):
+    return f"creator{data.creator_of[course_id]}@example.com"
+
+
+def _lesson(data, rng):
+    return rng.choice(data.lesson_ids_by_course[rng.choice(data.approved_course_ids)])
+
+
+def _course_progress(data, rng, n):
+    email, course_id = _enrolled(data, rng)
+    return Request("GET", f"/students/progress/{course_id}", email)
+
+
+def _complete_lesson(data, rng, n):
+    email, course_id = _enrolled(data, rng)
+    return Request("POST", "/students/complete-lesson", email,
+                   json={"lesson_id": rng.choice(data.lesson_ids_by_course[course_id])})
+
+
+def _complete_single(data, rng, n):
+    email, course_id = _enrolled(data, rng)
+    return Request("POST", "/students/progress/complete", email,
+                   json={"course_id": course_id, "lesson_id": rng.choice(data.lesson_ids_by_course[course_id])})
+
+
+def _complete_batch(data, rng, n):
+    email, course_id = _enrolled(data, rng)
+    lessons = data.lesson_ids_by_course[course_id]
+    return Request("POST", "/students/progress/complete-batch", email,
+                   json={"lesson_ids": rng.sample(list(lessons), min(5, len(lessons)))})
+
+
+def _certificate(data, rng, n):
+    student_id, course_id = rng.choice(data.completed or data.enrollments)
+    return Request("GET", f"/students/certificate/{course_id}", f"student{student_id}@example.com")
+
+
+def _cohort_certificates(data, rng, n):
+    course_id = rng.choice([c for _, c in data.completed] or data.approved_course_ids)
+    return Request("GET", f"/creator/courses/{course_id}/certificates", _creator(data, course_id))
+
+
+def _import_course(data, rng, n):
+    """A new course with 200 lessons as NDJSON."""
+    rows = [{"type": "course", "ref": "c", "title": f"Imported course {n}", "description": "Bulk import"}]
+    rows += [{"type": "lesson", "course": "c", "title": f"Lesson {i}", "content": "Imported lesson body. " * 20}
+             for i in range(200)]
+    body = "\n".join(json.dumps(row) for row in rows).encode()
+    return Request("POST", "/creator/courses/import", rng.choice(data.creator_emails),
+                   content=body, content_type="application/x-ndjson")
+
+
+def _create_lesson(data, rng, n):
+    course_id = rng.choice(data.course_ids)
+    return Request("POST", "/lessons/", _creator(data, course_id), json={
+        "title": f"Load lesson {n}", "content": "Generated during a load run. " * 20, "course_id": course_id,
+    })
+
+
+SEARCH_TERMS = ["python", "guitar", "stat", "cooking baking", "cryptography"]
+
+# One scenario per endpoint, grouped by router. Writes run at a fraction of
+# --requests so they don't reshape the dataset the reads are measured against.
+SCENARIOS = [
+    # auth_routes / user_routes
+    Scenario("login", lambda d, r, n: Request(
+        "POST", "/login/", data={"username": r.choice(d.student_emails), "password": PASSWORD}), 0.1),
+    Scenario("users.register", lambda d, r, n: Request(
+        "POST", "/users/register", json={"email": f"load{n}.{r.randrange(1 << 30)}@example.com",
+                                         "password": PASSWORD, "role": "student"}), 0.1),
+    Scenario("users.me", lambda d, r, n: Request("GET", "/users/me", r.choice(d.student_emails))),
+    # course_routes
+    Scenario("courses.approved", lambda d, r, n: Request("GET", "/courses/approved?limit=20")),
+    Scenario("courses.search", lambda d, r, n: Request("GET", f"/courses/search?q={r.choice(SEARCH_TERMS)}&limit=20")),
+    # lesson_routes
+    Scenario("lessons.by_course", lambda d, r, n: Request("GET", f"/lessons/course/{r.choice(d.approved_course_ids)}?limit=50")),
+    Scenario("lessons.outline", lambda d, r, n: Request("GET", f"/lessons/course/{r.choice(d.approved_course_ids)}/outline")),
+    Scenario("lessons.get", lambda d, r, n: Request("GET", f"/lessons/{_lesson(d, r)}")),
+    Scenario("lessons.content", lambda d, r, n: Request("GET", f"/lessons/{_lesson(d, r)}/content")),
+    Scenario("lessons.create", _create_lesson, 0.2),
+    # student_routes
+    Scenario("students.enrollments", lambda d, r, n: Request(
+        "GET", "/students/enrollments?include=progress&limit=20", _enrolled(d, r)[0])),
+    Scenario("students.progress", _course_progress),
+    Scenario("students.enroll", lambda d, r, n: Request(
+        "POST", "/students/enroll", r.choice(d.student_emails), json={"course_id": r.choice(d.approved_course_ids)})),
+    Scenario("students.complete_lesson", _complete_lesson),
+    # progress_routes
+    Scenario("progress.complete", _complete_single),
+    Scenario("progress.complete_batch", _complete_batch),
+    # certificate_routes
+    Scenario("certificates.student", _certificate),
+    # creator_routes
+    Scenario("creator.my_courses", lambda d, r, n: Request("GET", "/creator/my-courses", r.choice(d.creator_emails))),
+    Scenario("creator.create_course", lambda d, r, n: Request(
+        "POST", "/creator/courses", r.choice(d.creator_emails),
+        json={"title": f"Load course {n}", "description": "Created during a load run"}), 0.2),
+    Scenario("creator.import", _import_course, 0.05),
+    Scenario("creator.analytics", lambda d, r, n: (lambda c: Request(
+        "GET", f"/creator/courses/{c}/analytics", _creator(d, c)))(r.choice(d.approved_course_ids))),
+    Scenario("creator.cohort_certificates", _cohort_certificates, 0.05),
+    # admin_routes
+    Scenario("admin.review_courses", lambda d, r, n: Request("GET", "/admin/review/courses?limit=50", d.admin_email)),
+    Scenario("admin.users", lambda d, r, n: Request("GET", "/admin/users?limit=50", d.admin_email)),
+    Scenario("admin.stats", lambda d, r, n: Request("GET", "/admin/stats?include=roles", d.admin_email)),
+    Scenario("admin.export_progress", lambda d, r, n: Request(
+        "GET", f"/admin/export/progress?format=ndjson&gzip=true&course_id={r.choice(d.approved_course_ids)}",
+        d.admin_email), 0.1),
+    Scenario("admin.cache_catalog", lambda d, r, n: Request("GET", "/admin/cache/catalog", d.admin_email), 0.1),
+    Scenario("admin.approve", lambda d, r, n: Request("PUT", f"/admin/approve/{r.choice(d.course_ids)}", d.admin_email), 0.2),
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, scenario, data, requests, concurrency, auth, seed_value):
+    from app.utils import metrics
+
+    rng = random.Random(seed_value)
+    # Build every request up front so generation cost stays out of the timings
+    planned = [scenario.build(data, rng, n) for n in range(requests)]
+    queue = asyncio.Queue()
+    for item in planned:
+        queue.put_nowait(item)
+
+    latencies, sql_counts, sql_seconds, statuses = [], [], [], {}
+
+    async def worker():
+        while True:
+            try:
+                req = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            # MetricsMiddleware adds the request's [statements, seconds] to this
+            db_stats = [0, 0.0]
+            token = metrics._request_db.set(db_stats)
+            started = time.perf_counter()
+            try:
+                headers = dict(auth(req.email)) if req.email else {}
+                if req.content_type:
+                    headers["Content-Type"] = req.content_type
+                response = await client.request(
+                    req.method, req.path, json=req.json, data=req.data, content=req.content, headers=headers,
+                )
+                # Drain streamed bodies so the whole response is timed
+                await response.aread()
+                status = response.status_code
+            except Exception as exc:  # an app error must not stop the run
+                status = type(exc).__name__
+            finally:
+                metrics._request_db.reset(token)
+            latencies.append((time.perf_counter() - started) * 1000)
+            sql_counts.append(db_stats[0])
+            sql_seconds.append(db_stats[1])
+            statuses[status] = statuses.get(status, 0) + 1
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_started
+
+    latencies.sort()
+    errors = sum(n for status, n in statuses.items() if not isinstance(status, int) or status >= 500)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+        "sql_per_request_mean": round(statistics.fmean(sql_counts), 2),
+        "sql_per_request_max": max(sql_counts),
+        "sql_ms_per_request_mean": round(statistics.fmean(sql_seconds) * 1000, 3),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+    }
+
+
+async def run(args, data):
+    import httpx
+    from app.main import app
+    from app.controllers.progress_buffer import progress_buffer
+    from app.utils.auth_jwt import create_access_token
+
+    tokens = {}
+
+    def auth(email):
+        if email not in tokens:
+            tokens[email] = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+        return tokens[email]
+
+    scenarios = SCENARIOS
+    if args.only:
+        wanted = set(args.only.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    # The ASGI transport skips startup/shutdown, so run the write-behind flusher (if enabled) here
+    progress_buffer.start()
+    async with httpx.AsyncClient(transport=transport, base_url="http://load.test", timeout=None) as client:
+        for index, scenario in enumerate(scenarios):
+            requests = max(1, int(args.requests * scenario.weight_requests))
+            if args.warmup:
+                await run_scenario(client, scenario, data, min(args.warmup, requests), 1, auth, f"warmup-{index}")
+            results[scenario.name] = await run_scenario(
+                client, scenario, data, requests, args.concurrency, auth, args.seed + index,
+            )
+            print(f"{scenario.name:<30} p50 {results[scenario.name]['p50_ms']:>9.2f} ms  "
+                  f"p99 {results[scenario.name]['p99_ms']:>9.2f} ms  "
+                  f"{results[scenario.name]['throughput_rps']:>8} rps", file=sys.stderr)
+    progress_buffer.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint (cheap endpoints)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per endpoint first")
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    from app.database.connection import engine
+    from app.database.migrate import migrate
+
+    spec = SCALES[args.scale]
+    migrate(engine)
+    started = time.perf_counter()
+    data = seed(engine, spec)
+    seed_seconds = time.perf_counter() - started
+    print(f"seeded {args.scale} dataset in {seed_seconds:.1f}s", file=sys.stderr)
+
+    results = asyncio.run(run(args, data))
+
+    report = {
+        "meta": {
+            "dialect": engine.dialect.name,
+            "database_async": os.getenv("DATABASE_ASYNC", "false"),
+            "scale": args.scale,
+            "dataset": asdict(spec),
+            "seed_seconds": round(seed_seconds, 1),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "endpoints": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Synthetic dataset generator.
+
+Bulk-inserts users, courses, lessons, enrollments and progress (plus the
+completion bitmaps, lesson totals and search index) with executemany
+batches, using a fixed random seed so runs are reproducible. Rows are
+generated in batches, so memory stays flat even for millions of progress rows.
+
+    python -m benchmarks.seed --users 100000 --courses 10000 --lessons 200000 --progress 5000000
+"""
+import random
+import argparse
+from itertools import islice
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+
+BATCH = 10_000
+PASSWORD = "password"
+
+# Each course gets two topic words; lesson bodies mix them into Zipf-distributed filler,
+# so text search sees realistic selectivity (common filler, rarer topics)
+VOCABULARY = (
+    "python javascript rust golang sql database index query cache latency throughput "
+    "algebra calculus geometry statistics probability physics chemistry biology genetics "
+    "history economics marketing finance accounting design typography photography music "
+    "guitar piano painting drawing writing poetry grammar spanish french german japanese "
+    "cooking baking nutrition fitness yoga running cycling chess negotiation leadership "
+    "networking security cryptography compilers kernels robotics electronics astronomy"
+).split()
+_SYLLABLES = "ka lo mi ne ru sa ti vo ze pa de fi gu ho ja".split()
+
+
+def _filler_words(rng, size=3_000):
+    words = sorted({"".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4))) for _ in range(size * 2)})[:size]
+    rng.shuffle(words)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+    return words, cum_weights
+
+
+@dataclass
+class SeedSpec:
+    users: int = 2_000
+    courses: int = 200
+    lessons: int = 2_000
+    enrollments_per_student: int = 3
+    progress: int = 10_000
+    seed: int = 42
+
+
+@dataclass
+class SeedResult:
+    admin_email: str
+    creator_emails: list
+    student_emails: list
+    course_ids: list
+    approved_course_ids: list
+    lesson_ids_by_course: dict  # course id -> range of lesson ids
+    enrollments: list  # (student_id, course_id)
+    completed: list = field(default_factory=list)  # (student_id, course_id) with every lesson done
+    creator_of: dict = field(default_factory=dict)  # course id -> creator id
+
+
+def _insert(conn, table, rows):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH))
+        if not batch:
+            return
+        conn.execute(table.insert(), batch)
+
+
+def seed(engine, spec: SeedSpec = SeedSpec()) -> SeedResult:
+    """Populate an empty, migrated database and return handles for load generation."""
+    from app.models.user_model import User
+    from app.models.course_model import Course
+    from app.models.lesson_model import Lesson
+    from app.models.enrollment import Enrollment
+    from app.models.progress_model import Progress
+    from app.models.completion_model import CourseLessonCount, CompletionBitmap
+    from app.controllers import search_controller
+    from app.utils.hashing import hash_password
+
+    rng = random.Random(spec.seed)
+    filler, filler_weights = _filler_words(rng)
+    password_hash = hash_password(PASSWORD)
+
+    # Ids are assigned here: 1 is the admin, then creators, then students
+    n_creators = max(1, spec.users // 100)
+    creator_ids = list(range(2, n_creators + 2))
+    student_ids = list(range(n_creators + 2, spec.users + 1))
+
+    def users():
+        yield {"id": 1, "email": "admin@example.com", "name": "Admin", "role": "admin",
+               "password_hash": password_hash, "is_active": True}
+        for i in range(2, spec.users + 1):
+            role = "creator" if i <= n_creators + 1 else "student"
+            yield {"id": i, "email": f"{role}{i}@example.com", "name": f"{role} {i}", "role": role,
+                   "password_hash": password_hash, "is_active": True}
+
+    topics = {i: rng.sample(VOCABULARY, 2) for i in range(1, spec.courses + 1)}
+    courses = [
+        {"id": i, "title": f"Course {i}: {' '.join(topics[i])}",
+         "description": f"Synthetic course about {' '.join(topics[i] + rng.sample(VOCABULARY, 2))}",
+         "creator_id": rng.choice(creator_ids), "is_approved": rng.random() < 0.8}
+        for i in range(1, spec.courses + 1)
+    ]
+
+    per_course = max(1, spec.lessons // max(spec.courses, 1))
+    lesson_ids_by_course = {
+        c["id"]: range((c["id"] - 1) * per_course + 1, c["id"] * per_course + 1) for c in courses
+    }
+
+    def lessons():
+        for course in courses:
+            for position, lesson_id in enumerate(lesson_ids_by_course[course["id"]]):
+                words = rng.choices(filler, cum_weights=filler_weights, k=40)
+                for slot in rng.sample(range(40), 4):
+                    words[slot] = rng.choice(topics[course["id"]])
+                yield {"id": lesson_id, "course_id": course["id"],
+                       "title": f"Lesson {position + 1}: {rng.choice(topics[course['id']])}",
+                       "content": f"Lesson {position + 1} of course {course['id']}. {' '.join(words)}"}
+
+    approved_ids = [c["id"] for c in courses if c["is_approved"]] or [courses[0]["id"]]
+    enrollments = []
+    for student_id in student_ids:
+        for course_id in rng.sample(approved_ids, min(spec.enrollments_per_student, len(approved_ids))):
+            enrollments.append((student_id, course_id))
+    rng.shuffle(enrollments)
+
+    # Each enrollment completes a prefix of its course until the progress budget runs out
+    done_counts = []
+    budget = spec.progress
+    for _ in enrollments:
+        if budget <= 0:
+            break
+        done = min(rng.randint(0, per_course), budget)
+        budget -= done
+        done_counts.append(done)
+    completed = [pair for pair, done in zip(enrollments, done_counts) if done == per_course]
+
+    def progress():
+        for (student_id, course_id), done in zip(enrollments, done_counts):
+            for lesson_id in lesson_ids_by_course[course_id][:done]:
+                yield {"student_id": student_id, "course_id": course_id, "lesson_id": lesson_id, "is_completed": True}
+
+    def bitmaps():
+        for (student_id, course_id), done in zip(enrollments, done_counts):
+            value = (1 << done) - 1
+            yield {"student_id": student_id, "course_id": course_id,
+                   "bits": value.to_bytes((value.bit_length() + 7) // 8, "little")}
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("PRAGMA synchronous = OFF"))
+        _insert(conn, User.__table__, users())
+        _insert(conn, Course.__table__, courses)
+        _insert(conn, Lesson.__table__, lessons())
+        _insert(conn, CourseLessonCount.__table__,
+                ({"course_id": cid, "lesson_total": len(ids)} for cid, ids in lesson_ids_by_course.items()))
+        _insert(conn, Enrollment.__table__,
+                ({"student_id": s, "course_id": c, "completed": False} for s, c in enrollments))
+        _insert(conn, Progress.__table__, progress())
+        _insert(conn, CompletionBitmap.__table__, bitmaps())
+        if engine.dialect.name == "postgresql":
+            # Explicit ids were inserted; move the sequences past them
+            for table in ("users", "courses", "lessons", "enrollments", "progress"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+                ))
+        # Rows went in below the controllers, so rebuild the full-text index in bulk
+        search_controller.rebuild_index(conn)
+        conn.execute(text("ANALYZE"))
+
+    return SeedResult(
+        admin_email="admin@example.com",
+        creator_emails=[f"creator{i}@example.com" for i in creator_ids],
+        student_emails=[f"student{i}@example.com" for i in student_ids],
+        course_ids=[c["id"] for c in courses],
+        approved_course_ids=approved_ids,
+        lesson_ids_by_course=lesson_ids_by_course,
+        enrollments=enrollments,
+        completed=completed,
+        creator_of={c["id"]: c["creator_id"] for c in courses},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the DATABASE_URL database with synthetic data")
+    parser.add_argument("--users", type=int, default=SeedSpec.users)
+    parser.add_argument("--courses", type=int, default=SeedSpec.courses)
+    parser.add_argument("--lessons", type=int, default=SeedSpec.lessons)
+    parser.add_argument("--enrollments-per-student", type=int, default=SeedSpec.enrollments_per_student)
+    parser.add_argument("--progress", type=int, default=SeedSpec.progress)
+    parser.add_argument("--seed", type=int, default=SeedSpec.seed)
+    args = parser.parse_args()
+
+    from app.database.connection import engine
+    from app.database.migrate import migrate
+
+    migrate(engine)
+    spec = SeedSpec(args.users, args.courses, args.lessons, args.enrollments_per_student, args.progress, args.seed)
+    result = seed(engine, spec)
+    print(f"Seeded {args.users} users, {len(result.course_ids)} courses, "
+          f"{sum(map(len, result.lesson_ids_by_course.values()))} lessons, {len(result.enrollments)} enrollments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Shared fixtures. The app runs against a throwaway SQLite database that is
+migrated once per session and emptied before every test.
+
+Run from microcourses-backend/:
+    python -m pytest -q
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Configure the app before anything imports it (load_dotenv never overrides these)
+TEST_DIR = tempfile.mkdtemp(prefix="microcourses-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(TEST_DIR, "primary.db")
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["DATABASE_ASYNC"] = "false"
+os.environ["PROGRESS_WRITE_BEHIND"] = "false"
+os.environ["HASH_WORKERS"] = "0"
+os.environ["CERT_RENDER_WORKERS"] = "0"
+os.environ["CERT_CACHE_DIR"] = os.path.join(TEST_DIR, "certificates")
+os.environ["STATS_REFRESH_SECONDS"] = "0"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app.database.connection import Base, SessionLocal, engine  # noqa: E402
+from app.database.migrate import migrate  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.course_model import Course  # noqa: E402
+from app.models.lesson_model import Lesson  # noqa: E402
+from app.models.user_model import User  # noqa: E402
+from app.utils.auth_jwt import create_access_token  # noqa: E402
+
+migrate(engine)
+
+
+def _reset_caches():
+    from app.controllers import completion_controller
+    from app.controllers.analytics_controller import analytics_cache
+    from app.routes.lesson_routes import lesson_bodies
+    from app.utils.auth_jwt import principal_cache
+    from app.utils.catalog_cache import catalog_cache
+
+    principal_cache.clear()
+    catalog_cache.clear()
+    lesson_bodies.clear()
+    analytics_cache.entries.clear()
+    completion_controller._lesson_ids_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(text("DELETE FROM search_index"))
+    _reset_caches()
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+def auth_headers(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+
+def add_user(db, email: str, role: str) -> int:
+    user = User(email=email, name=email.split("@")[0], role=role, password_hash="unused")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def add_course(db, creator_id: int, lessons: int = 0, approved: bool = True, title: str = "Course") -> int:
+    course = Course(title=title, description="d", creator_id=creator_id, is_approved=approved)
+    db.add(course)
+    db.flush()
+    db.add_all(Lesson(title=f"{title} lesson {n}", content="x" * 100, course_id=course.id) for n in range(lessons))
+    db.commit()
+    return course.id
+
+
+@contextmanager
+def count_statements(bind=engine):
+    """Count SQL statements sent through `bind` inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
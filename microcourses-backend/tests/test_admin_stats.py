@@ -0,0 +1,23 @@
+from app.controllers.stats_controller import StatsSnapshot
+from conftest import add_user
+
+
+def test_snapshot_without_a_refresher_recomputes(db):
+    add_user(db, "admin@example.com", "admin")
+    snapshot = StatsSnapshot(interval=0)
+    assert snapshot.get(db)[0]["total_users"] == 1
+
+    add_user(db, "student@example.com", "student")
+    stats, age = snapshot.get(db)
+    assert stats["total_users"] == 2 and age < 1
+
+
+def test_snapshot_is_reused_until_it_is_older_than_the_interval(db):
+    add_user(db, "admin@example.com", "admin")
+    snapshot = StatsSnapshot(interval=60)
+    snapshot.get(db)
+    add_user(db, "student@example.com", "student")
+    assert snapshot.get(db)[0]["total_users"] == 1
+
+    snapshot._taken_at -= 61
+    assert snapshot.get(db)[0]["total_users"] == 2
@@ -0,0 +1,17 @@
+import asyncio
+from app.models.user_model import User
+from app.utils.auth_jwt import invalidate_principal, principal_from_authorization
+from conftest import add_user, auth_headers
+
+
+def test_deactivated_users_are_rejected_on_every_path(client, db):
+    add_user(db, "student@example.com", "student")
+    headers = auth_headers("student@example.com")
+    assert client.get("/students/enrollments", headers=headers).status_code == 200
+
+    db.query(User).update({User.is_active: False})
+    db.commit()
+    invalidate_principal("student@example.com")
+
+    assert client.get("/students/enrollments", headers=headers).status_code == 401
+    assert asyncio.run(principal_from_authorization(headers["Authorization"])) is None
@@ -0,0 +1,34 @@
+import os
+from email.utils import formatdate
+from app.models.enrollment import Enrollment
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from conftest import add_course, add_user, auth_headers
+
+
+def test_last_modified_stays_put_across_cache_hits(client, db):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    student_id = add_user(db, "student@example.com", "student")
+    course_id = add_course(db, creator_id, lessons=2)
+    db.add(Enrollment(student_id=student_id, course_id=course_id))
+    db.add_all(
+        Progress(student_id=student_id, course_id=course_id, lesson_id=lesson_id, is_completed=True)
+        for (lesson_id,) in db.query(Lesson.id).filter(Lesson.course_id == course_id)
+    )
+    db.commit()
+    path = f"/students/certificate/{course_id}"
+    headers = auth_headers("student@example.com")
+
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200 and first.content.startswith(b"%PDF")
+
+    # Age the stored file, as if it had been rendered a minute ago
+    stored = os.path.join(os.environ["CERT_CACHE_DIR"], first.headers["ETag"].strip('"') + ".pdf")
+    written = os.path.getmtime(stored) - 60
+    os.utime(stored, (written, written))
+
+    second = client.get(path, headers=headers)
+    assert second.headers["Last-Modified"] == formatdate(written, usegmt=True)
+    revalidated = client.get(path, headers={**headers, "If-Modified-Since": second.headers["Last-Modified"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["Last-Modified"] == second.headers["Last-Modified"]
@@ -0,0 +1,79 @@
+from sqlalchemy import event
+from app.controllers import completion_controller
+from app.database.connection import SessionLocal, engine
+from app.models.completion_model import CompletionBitmap, CourseLessonCount
+from app.models.enrollment import Enrollment
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from conftest import add_course, add_user, auth_headers, count_statements
+
+
+def _setup(db, lessons: int = 3, enrolled: bool = True):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    student_id = add_user(db, "student@example.com", "student")
+    course_id = add_course(db, creator_id, lessons=lessons)
+    if enrolled:
+        db.add(Enrollment(student_id=student_id, course_id=course_id))
+        db.commit()
+    lesson_ids = [lesson_id for (lesson_id,) in db.query(Lesson.id).filter(Lesson.course_id == course_id).order_by(Lesson.id)]
+    return student_id, course_id, lesson_ids
+
+
+def _complete(db, student_id, course_id, lesson_ids):
+    db.add_all(Progress(student_id=student_id, course_id=course_id, lesson_id=l, is_completed=True) for l in lesson_ids)
+    db.commit()
+
+
+def test_progress_read_without_bitmap_does_not_write(client, db):
+    student_id, course_id, lessons = _setup(db)
+    _complete(db, student_id, course_id, [lessons[0], lessons[2]])
+
+    with count_statements() as statements:
+        response = client.get(f"/students/progress/{course_id}", headers=auth_headers("student@example.com"))
+
+    assert response.json() == {"course_id": course_id, "completed_lessons": [lessons[0], lessons[2]], "total_lessons": 3}
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+    assert db.query(CompletionBitmap).count() == 0
+
+
+def test_reads_by_students_who_are_not_enrolled_leave_no_bitmap(client, db):
+    _, course_id, _ = _setup(db, enrolled=False)
+
+    response = client.get(f"/students/progress/{course_id}", headers=auth_headers("student@example.com"))
+    assert response.json()["completed_lessons"] == []
+    assert db.query(CompletionBitmap).count() == 0
+
+
+def test_enrolling_starts_an_empty_bitmap(client, db):
+    _, course_id, _ = _setup(db, enrolled=False)
+
+    response = client.post("/students/enroll", json={"course_id": course_id}, headers=auth_headers("student@example.com"))
+    assert response.status_code == 200
+    assert [bitmap.bits for bitmap in db.query(CompletionBitmap)] == [b""]
+
+
+def test_first_completion_survives_a_concurrent_bitmap_insert(db):
+    student_id, course_id, lessons = _setup(db)
+    db.add(CourseLessonCount(course_id=course_id, lesson_total=3))
+    db.commit()
+
+    def other_writer_first(conn, cursor, statement, *args):
+        # Another request creates the bitmap (with lesson 0 done) just before ours
+        if statement.startswith("INSERT INTO completion_bitmaps") and not raced:
+            raced.append(True)
+            with engine.begin() as other:
+                other.execute(CompletionBitmap.__table__.insert().values(
+                    student_id=student_id, course_id=course_id, bits=b"\x01"))
+
+    raced = []
+    event.listen(engine, "before_cursor_execute", other_writer_first)
+    try:
+        with SessionLocal() as session:
+            newly = completion_controller.record_completions(session, student_id, course_id, [lessons[1]])
+            session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", other_writer_first)
+
+    assert raced and newly == [lessons[1]]
+    assert db.query(CompletionBitmap.bits).scalar() == b"\x03"
+
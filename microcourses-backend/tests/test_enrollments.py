@@ -0,0 +1,68 @@
+import pytest
+from app.models.enrollment import Enrollment
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from conftest import add_course, add_user, auth_headers, count_statements
+
+
+def _student_with_enrollments(db, email: str, creator_id: int, count: int) -> dict:
+    student_id = add_user(db, email, "student")
+    for n in range(count):
+        course_id = add_course(db, creator_id, lessons=2, title=f"{email} {n}")
+        db.add(Enrollment(student_id=student_id, course_id=course_id))
+        if n % 2:
+            lesson_id = db.query(Lesson.id).filter(Lesson.course_id == course_id).limit(1).scalar()
+            db.add(Progress(student_id=student_id, course_id=course_id, lesson_id=lesson_id, is_completed=True))
+    db.commit()
+    return auth_headers(email)
+
+
+@pytest.mark.parametrize("params", [{}, {"include": "progress"}])
+def test_statement_count_does_not_grow_with_enrollments(client, db, params):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    few = _student_with_enrollments(db, "few@example.com", creator_id, 1)
+    many = _student_with_enrollments(db, "many@example.com", creator_id, 200)
+
+    counts = []
+    for headers, expected_rows in [(few, 1), (many, 200)]:
+        # Warm the principal cache so both requests do the same auth work
+        client.get("/students/enrollments", params=params, headers=headers)
+        with count_statements() as statements:
+            response = client.get("/students/enrollments", params=params, headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == expected_rows
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_progress_counts(client, db):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    headers = _student_with_enrollments(db, "student@example.com", creator_id, 4)
+
+    items = client.get("/students/enrollments", params={"include": "progress"}, headers=headers).json()
+    assert [item["completed_lessons"] for item in items] == [0, 1, 0, 1]
+
+
+def test_requests_without_cursor_or_limit_get_every_enrollment(client, db):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    headers = _student_with_enrollments(db, "student@example.com", creator_id, 120)
+
+    response = client.get("/students/enrollments", headers=headers)
+    assert len(response.json()) == 120
+    assert "X-Next-After" not in response.headers
+
+
+def test_keyset_pages(client, db):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    headers = _student_with_enrollments(db, "student@example.com", creator_id, 120)
+
+    seen, params = [], {"limit": 50}
+    while True:
+        response = client.get("/students/enrollments", params=params, headers=headers)
+        seen.extend(item["id"] for item in response.json())
+        if "X-Next-After" not in response.headers:
+            break
+        params = {"limit": 50, "after": response.headers["X-Next-After"]}
+
+    assert len(seen) == len(set(seen)) == 120
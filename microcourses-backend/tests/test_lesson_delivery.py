@@ -0,0 +1,82 @@
+import gzip
+import pytest
+from app.utils import content_delivery
+from conftest import add_course, add_user, auth_headers, count_statements
+
+CONTENT = "Lesson text. " * 500
+
+
+@pytest.fixture
+def lesson(client, db):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    course_id = add_course(db, creator_id)
+    response = client.post(
+        "/lessons/",
+        json={"title": "Long lesson", "content": CONTENT, "course_id": course_id},
+        headers=auth_headers("creator@example.com"),
+    )
+    return response.json()
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    calls = []
+    encode = content_delivery._encode
+
+    def counting_encode(body, coding):
+        calls.append(coding)
+        return encode(body, coding)
+
+    monkeypatch.setattr(content_delivery, "_encode", counting_encode)
+    return calls
+
+
+def test_repeat_requests_skip_the_database_and_compression(client, lesson, encodes):
+    path = f"/lessons/{lesson['id']}/content"
+    first = client.get(path, headers={"Accept-Encoding": "gzip"})
+    prepared = len(encodes)
+
+    with count_statements() as statements:
+        second = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert statements == [] and len(encodes) == prepared
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.headers["Content-Encoding"] == "gzip"
+    assert second.text == CONTENT
+
+
+def test_representations(client, lesson):
+    path = f"/lessons/{lesson['id']}/content"
+    identity = client.get(path, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+
+    partial = client.get(path, headers={"Range": "bytes=0-11", "Accept-Encoding": "gzip"})
+    assert partial.status_code == 206 and partial.content == CONTENT[:12].encode()
+
+    compressed = client.get(path, headers={"Accept-Encoding": "gzip"})
+    cached = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]})
+    assert cached.status_code == 304
+
+    assert client.get(f"/lessons/{lesson['id']}").json() == lesson
+    assert client.get("/lessons/999999/content").status_code == 404
+
+
+def test_new_lessons_in_the_course_invalidate_prepared_bodies(client, lesson):
+    path = f"/lessons/{lesson['id']}"
+    client.get(path)
+    client.post(
+        "/lessons/",
+        json={"title": "Next", "content": "more", "course_id": lesson["course_id"]},
+        headers=auth_headers("creator@example.com"),
+    )
+
+    with count_statements() as statements:
+        assert client.get(path).json() == lesson
+    assert statements
+
+
+def test_prepare_compresses_once_per_coding():
+    prepared = content_delivery.prepare(CONTENT.encode(), "text/plain")
+
+    assert gzip.decompress(prepared.encodings["gzip"]) == CONTENT.encode()
+    assert content_delivery.prepare(b"tiny", "text/plain").encodings == {}
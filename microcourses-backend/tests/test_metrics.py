@@ -0,0 +1,39 @@
+import asyncio
+from app import main
+from app.utils import metrics
+from conftest import add_user, auth_headers
+
+
+def test_metrics_require_an_admin_without_a_token(client, db):
+    add_user(db, "admin@example.com", "admin")
+    add_user(db, "student@example.com", "student")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=auth_headers("student@example.com")).status_code == 403
+    response = client.get("/metrics", headers=auth_headers("admin@example.com"))
+    assert response.status_code == 200 and "http_requests_total" in response.text
+
+
+def test_metrics_token(client, db, monkeypatch):
+    add_user(db, "admin@example.com", "admin")
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+
+    assert client.get("/metrics", headers=auth_headers("admin@example.com")).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_request_statements_are_added_to_the_callers_stats():
+    # How benchmarks.load counts SQL per request
+    import httpx
+
+    async def request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            metrics._request_db.set(db_stats)
+            return await client.get("/courses/approved")
+
+    db_stats = [0, 0.0]
+    response = asyncio.run(request())
+
+    assert response.status_code == 200
+    assert db_stats[0] >= 1 and db_stats[1] > 0
@@ -0,0 +1,48 @@
+from app.utils.pagination import DEFAULT_PAGE_SIZE
+from conftest import add_course, add_user, auth_headers
+
+ROWS = DEFAULT_PAGE_SIZE + 20
+
+
+def _courses(db, approved: bool):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    for n in range(ROWS):
+        add_course(db, creator_id, approved=approved, title=f"Course {n}")
+
+
+def _follow(client, path: str, headers=None, limit: int = 30) -> list:
+    items, params = [], {"limit": limit}
+    while True:
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200
+        items.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return items
+        params = {"cursor": cursor}
+
+
+def test_catalog_without_cursor_or_limit_returns_every_row(client, db):
+    _courses(db, approved=True)
+
+    response = client.get("/courses/approved")
+    assert len(response.json()) == ROWS
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_admin_lists_without_cursor_or_limit_return_every_row(client, db):
+    _courses(db, approved=False)
+    add_user(db, "admin@example.com", "admin")
+    admin = auth_headers("admin@example.com")
+
+    assert len(client.get("/admin/review/courses", headers=admin).json()) == ROWS
+    assert len(client.get("/admin/users", headers=admin).json()) == 2
+
+
+def test_cursor_pages_cover_every_row_once(client, db):
+    _courses(db, approved=True)
+
+    # The first page sets the size; later pages carry only the cursor and use the default
+    ids = [course["id"] for course in _follow(client, "/courses/approved")]
+    assert len(ids) == len(set(ids)) == ROWS
+    assert ids == sorted(ids)
@@ -0,0 +1,37 @@
+import sys
+import time
+import threading
+from app.utils.profiling import Profile, ProfileStore, Sampler
+
+
+def _busy(profile, started, done):
+    profile.anchors.add(sys._getframe())
+    started.set()
+    while not done.is_set():
+        sum(range(1000))
+
+
+def test_removed_profile_is_final(tmp_path):
+    sampler = Sampler(0.001)
+    profile = Profile({}, "requested")
+    started, done = threading.Event(), threading.Event()
+    worker = threading.Thread(target=_busy, args=(profile, started, done))
+    worker.start()
+    started.wait()
+    try:
+        sampler.add(profile)
+        while profile.samples < 5:
+            time.sleep(0.005)
+        stacks, samples = sampler.remove(profile)
+        time.sleep(0.05)
+    finally:
+        done.set()
+        worker.join()
+
+    assert profile.samples == samples == sum(stacks.values())
+    assert all(stack.startswith("_busy ") for stack in stacks)
+
+    store = ProfileStore(str(tmp_path), keep=5)
+    store.save(profile.id, stacks, {"id": profile.id})
+    with open(store.path(profile.id)) as f:
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in f) == samples
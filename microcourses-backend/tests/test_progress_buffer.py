@@ -0,0 +1,150 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.controllers import completion_controller, enrollment_controller, progress_buffer, progress_controller
+from app.controllers.progress_buffer import PENDING, QUEUED, ProgressBuffer
+from app.models.completion_model import CompletionBitmap
+from app.models.lesson_model import Lesson
+from app.models.progress_model import Progress
+from app.models.user_model import User
+from conftest import add_course, add_user, auth_headers
+
+STUDENT = "student@example.com"
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """An enabled write-behind buffer with no flusher thread: batches are written only when a test flushes."""
+    buffer = ProgressBuffer(enabled=True, interval=60, batch_size=100, max_pending=1000)
+    for module in (progress_controller, completion_controller, enrollment_controller):
+        monkeypatch.setattr(module, "progress_buffer", buffer)
+    return buffer
+
+
+@pytest.fixture
+def course(client, db):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    add_user(db, STUDENT, "student")
+    course_id = add_course(db, creator_id, lessons=3)
+    client.post("/students/enroll", json={"course_id": course_id}, headers=auth_headers(STUDENT))
+    lesson_ids = [lesson_id for (lesson_id,) in db.query(Lesson.id).filter(Lesson.course_id == course_id).order_by(Lesson.id)]
+    return course_id, lesson_ids
+
+
+def _complete(client, lesson_id):
+    return client.post("/students/complete-lesson", json={"lesson_id": lesson_id}, headers=auth_headers(STUDENT))
+
+
+def _progress(client, course_id):
+    return client.get(f"/students/progress/{course_id}", headers=auth_headers(STUDENT)).json()["completed_lessons"]
+
+
+def _feed_count(client):
+    items = client.get("/students/enrollments", params={"include": "progress"}, headers=auth_headers(STUDENT)).json()
+    return items[0]["completed_lessons"]
+
+
+def test_repeated_completions_coalesce(buffer):
+    assert buffer.add(1, 10, 100) == QUEUED
+    assert buffer.add(1, 10, 100) == PENDING
+    assert buffer.stats()["pending"] == 1 and buffer.stats()["coalesced"] == 1
+
+
+def test_queued_completions_are_visible_before_they_are_written(client, db, buffer, course):
+    course_id, lessons = course
+
+    assert "marked as completed" in _complete(client, lessons[0]).json()["message"]
+    assert "already" in _complete(client, lessons[0]).json()["message"]
+    assert db.query(Progress).count() == 0
+
+    assert _progress(client, course_id) == [lessons[0]]
+    assert _feed_count(client) == 1
+
+
+def test_queued_lessons_are_not_reported_as_written(db, buffer, course):
+    _, lessons = course
+    result = progress_controller.record_lesson_completion(db, _student_id(db), lessons[0])
+
+    assert result["queued"] == [lessons[0]]
+    assert result["newly_completed"] == [] and result["completed"] == []
+
+
+def test_a_failing_completion_does_not_hold_up_the_queue(db, buffer, course, monkeypatch):
+    course_id, lessons = course
+    student_id = _student_id(db)
+    write = progress_buffer._write
+
+    def write_rejecting_lesson_0(events):
+        if any(lesson_id == lessons[0] for _, _, lesson_id in events):
+            raise ValueError("rejected")
+        write(events)
+
+    monkeypatch.setattr(progress_buffer, "_write", write_rejecting_lesson_0)
+    buffer.max_attempts = 2
+    for lesson_id in lessons:
+        buffer.add(student_id, course_id, lesson_id)
+
+    assert buffer.flush() == 2
+    assert sorted(lesson_id for (lesson_id,) in db.query(Progress.lesson_id)) == lessons[1:]
+    assert buffer.pending_by_course(student_id) == {course_id: {lessons[0]}}
+
+    assert buffer.flush() == 1
+    assert buffer.size == 0
+    assert [entry[:3] for entry in buffer.dead_letters] == [(student_id, course_id, lessons[0])]
+    assert buffer.stats()["dead_lettered"] == 1
+
+
+def test_connection_errors_keep_the_batch_queued(db, buffer, course, monkeypatch):
+    course_id, lessons = course
+
+    def unreachable(events):
+        raise OperationalError("INSERT", {}, Exception("database is down"))
+
+    monkeypatch.setattr(progress_buffer, "_write", unreachable)
+    buffer.max_attempts = 1
+    buffer.add(_student_id(db), course_id, lessons[0])
+
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    assert buffer.size == 1 and not buffer.dead_letters
+
+
+def test_completions_written_but_still_queued_are_counted_once(client, db, buffer, course):
+    course_id, lessons = course
+    _complete(client, lessons[0])
+    _complete(client, lessons[1])
+
+    # The flusher's window between committing a batch and taking it off the queue
+    progress_controller.write_completions(db, [(_student_id(db), course_id, lessons[0])])
+    db.commit()
+    assert buffer.size == 2
+
+    assert _feed_count(client) == 2
+    assert _progress(client, course_id) == lessons[:2]
+
+
+def test_completion_stored_without_a_bitmap_is_not_queued_again(client, db, buffer, course):
+    course_id, lessons = course
+    db.query(CompletionBitmap).delete()
+    db.add(Progress(student_id=_student_id(db), course_id=course_id, lesson_id=lessons[0], is_completed=True))
+    db.commit()
+
+    assert "already" in _complete(client, lessons[0]).json()["message"]
+    assert buffer.size == 0
+    assert _feed_count(client) == 1
+
+
+def test_stop_drains_the_queue(client, db, buffer, course):
+    course_id, lessons = course
+    for lesson_id in lessons:
+        _complete(client, lesson_id)
+
+    buffer.start()
+    buffer.stop()
+
+    assert buffer.size == 0
+    assert sorted(lesson_id for (lesson_id,) in db.query(Progress.lesson_id)) == lessons
+    assert db.query(CompletionBitmap.bits).scalar() == b"\x07"
+
+
+def _student_id(db):
+    return db.query(User.id).filter(User.email == STUDENT).scalar()
@@ -0,0 +1,8 @@
+from benchmarks.check_query_plans import check_plans
+
+
+def test_hot_routes_avoid_full_table_scans():
+    report = check_plans()
+
+    assert report["statements_checked"] > 0
+    assert report["violations"] == []
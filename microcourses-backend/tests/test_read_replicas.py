@@ -0,0 +1,98 @@
+"""
+Read routing against two SQLite files: the test database is the primary and
+a second, separately migrated file plays a replica that has replicated nothing.
+"""
+import os
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import dependency, routing
+from app.database.connection import engine
+from app.database.migrate import migrate
+from app.models.enrollment import Enrollment
+from app.models.lesson_model import Lesson
+from app.utils import pagination
+from conftest import TEST_DIR, add_course, add_user, auth_headers, count_statements
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    path = os.path.join(TEST_DIR, "replica.db")
+    replica_engine = create_engine("sqlite:///" + path)
+    migrate(replica_engine)
+
+    replicas = routing.ReplicaSet([replica_engine], interval=0)
+    read_session = sessionmaker(
+        class_=routing._routing_session(engine, [replica_engine]), autocommit=False, autoflush=False, bind=engine
+    )
+    monkeypatch.setattr(routing, "replicas", replicas)
+    monkeypatch.setattr(dependency, "ReadSessionLocal", read_session)
+    monkeypatch.setattr(pagination, "ReadSessionLocal", read_session)
+    yield replicas
+    replica_engine.dispose()
+    os.remove(path)
+
+
+def _titles(response):
+    return [course["title"] for course in response.json()]
+
+
+def test_cached_pages_are_filled_from_the_primary(client, db, replica):
+    admin_id = add_user(db, "admin@example.com", "admin")
+    add_course(db, admin_id, title="Live")
+    pending_id = add_course(db, admin_id, approved=False, title="Pending")
+
+    assert _titles(client.get("/courses/approved")) == ["Live"]
+    client.put(f"/admin/approve/{pending_id}", headers=auth_headers("admin@example.com"))
+    # Read-your-writes: the replica still has neither course
+    assert _titles(client.get("/courses/approved")) == ["Live", "Pending"]
+    assert _titles(client.get("/courses/approved", params={"stream": "true"})) == []
+
+
+def test_lesson_bodies_and_analytics_are_filled_from_the_primary(client, db, replica):
+    creator_id = add_user(db, "creator@example.com", "creator")
+    student_id = add_user(db, "student@example.com", "student")
+    course_id = add_course(db, creator_id, lessons=1)
+    lesson_id = db.query(Lesson.id).filter(Lesson.course_id == course_id).scalar()
+    db.add(Enrollment(student_id=student_id, course_id=course_id))
+    db.commit()
+    # The replica has the course, but not the enrollment
+    with replica.engines[0].begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO courses (id, title, description, creator_id, is_approved) VALUES (?, 'Course', 'd', ?, 1)",
+            (course_id, creator_id),
+        )
+
+    assert client.get(f"/lessons/{lesson_id}").json()["id"] == lesson_id
+    assert client.get(f"/lessons/course/{course_id}").json()[0]["id"] == lesson_id
+    analytics = client.get(f"/creator/courses/{course_id}/analytics", headers=auth_headers("creator@example.com"))
+    assert analytics.json()["enrolled"] == 1
+
+
+def test_reads_fall_back_to_the_primary_when_the_replica_is_down(client, db, replica):
+    admin_id = add_user(db, "admin@example.com", "admin")
+    add_course(db, admin_id, approved=False, title="Pending")
+    headers = auth_headers("admin@example.com")
+
+    assert client.get("/admin/review/courses", headers=headers).json() == []
+    assert replica.reads == [1]
+
+    replica.mark(0, False)
+    assert _titles(client.get("/admin/review/courses", headers=headers)) == ["Pending"]
+    assert replica.fallbacks == 1
+
+
+def test_search_is_served_by_the_replica(client, db, replica):
+    admin_id = add_user(db, "admin@example.com", "admin")
+    add_course(db, admin_id, title="Primary only")
+    with replica.engines[0].begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO courses (id, title, description, creator_id, is_approved) VALUES (7, 'Replicated', 'd', 1, 1)"
+        )
+        conn.exec_driver_sql("INSERT INTO search_index (title, body, course_id) VALUES ('Replicated', 'd', 7)")
+
+    with count_statements() as on_primary:
+        response = client.get("/courses/search", params={"q": "replicated"})
+
+    assert _titles(response) == ["Replicated"]
+    assert on_primary == [] and replica.reads == [1]